@@ -3,36 +3,109 @@
 Quick script to check if you're getting REAL or MOCK satellite data
 """
 
-import sys
-try:
+import functools
+import importlib.util
+import os
+import time
+from pathlib import Path
+from typing import Tuple
+
+EE_PROJECT = 'nidaan-ai'
+# Same endpoint as satellite_monitor, since an interpreter initialized here is reused there
+EE_API_URL = os.environ.get('EE_API_URL', 'https://earthengine-highvolume.googleapis.com')
+# A successful init is remembered for a few minutes so repeated health checks
+# don't each pay for a credential refresh + metadata RPC.
+INIT_CACHE_PATH = Path(os.path.expanduser("~/.cache/oceaneye")) / f"ee_init_ok.{EE_PROJECT}"
+INIT_CACHE_TTL_S = 600
+
+# Each report is emitted with a single write instead of one print per line
+SUCCESS_MSG = (
+    "✓ earthengine-api is installed\n"
+    "✓ Earth Engine initialized successfully!\n"
+    "✓ You are configured for REAL satellite data!\n"
+    "\n🛰️ Data source: Copernicus Sentinel-2 satellites\n"
+    "📡 Resolution: 10 meters\n"
+    "🌍 Coverage: Global\n"
+    "\nYour backend will use REAL satellite imagery! 🎉\n"
+)
+NOT_INSTALLED_MSG = (
+    "✗ earthengine-api not installed\n"
+    "\n⚠️ Your backend will use MOCK data\n"
+    "\nTo fix:\n"
+    "1. Run: pip install earthengine-api\n"
+    "2. Run: earthengine authenticate\n"
+    "3. Restart your backend\n"
+)
+BROKEN_INSTALL_MSG = (
+    "✗ earthengine-api is installed but failed to import\n"
+    "  Error: {error}\n"
+    "\n⚠️ Your backend will use MOCK data\n"
+    "\nTo fix:\n"
+    "1. Run: pip install --force-reinstall earthengine-api\n"
+    "2. Restart your backend\n"
+)
+INIT_FAILED_MSG = (
+    "✓ earthengine-api is installed\n"
+    "✗ Earth Engine initialization failed\n"
+    "  Error: {error}\n"
+    "\n⚠️ Your backend will use MOCK data\n"
+    "\nTo fix:\n"
+    "1. Run: earthengine authenticate\n"
+    "2. Restart your backend\n"
+)
+
+
+def initialize_earth_engine(project=EE_PROJECT):
+    """Initialize Earth Engine unless this interpreter already holds credentials."""
     import ee
-    print("✓ earthengine-api is installed")
-    
+    if not getattr(ee.data, "_credentials", None):
+        ee.Initialize(project=project, opt_url=EE_API_URL)
+
+
+@functools.lru_cache(maxsize=1)
+def diagnose() -> Tuple[bool, str]:
+    """Run the Earth Engine check once per process and return (ok, report)."""
+    # Probe for earthengine-api without importing it; `import ee` pulls in the
+    # whole google-auth / httplib2 chain, which is wasted work on the missing path.
+    if importlib.util.find_spec("ee") is None:
+        return False, NOT_INSTALLED_MSG
+
+    try:
+        if time.time() - INIT_CACHE_PATH.stat().st_mtime < INIT_CACHE_TTL_S:
+            return True, SUCCESS_MSG
+    except OSError:
+        pass
+
+    # find_spec only proves the package is on the path; catch broken installs here
+    try:
+        import ee  # type: ignore # noqa: F401
+    except ImportError as e:
+        return False, BROKEN_INSTALL_MSG.format(error=e)
+
     # Try to initialize
     try:
-        ee.Initialize(project='nidaan-ai')
-        print("✓ Earth Engine initialized successfully!")
-        print("✓ You are configured for REAL satellite data!")
-        print("\n🛰️ Data source: Copernicus Sentinel-2 satellites")
-        print("📡 Resolution: 10 meters")
-        print("🌍 Coverage: Global")
-        print("\nYour backend will use REAL satellite imagery! 🎉")
-        sys.exit(0)
+        initialize_earth_engine()
     except Exception as e:
-        print("✗ Earth Engine initialization failed")
-        print(f"  Error: {e}")
-        print("\n⚠️ Your backend will use MOCK data")
-        print("\nTo fix:")
-        print("1. Run: earthengine authenticate")
-        print("2. Restart your backend")
-        sys.exit(1)
-        
-except ImportError:
-    print("✗ earthengine-api not installed")
-    print("\n⚠️ Your backend will use MOCK data")
-    print("\nTo fix:")
-    print("1. Run: pip install earthengine-api")
-    print("2. Run: earthengine authenticate")
-    print("3. Restart your backend")
-    sys.exit(1)
+        try:
+            INIT_CACHE_PATH.unlink(missing_ok=True)
+        except OSError:
+            pass
+        return False, INIT_FAILED_MSG.format(error=e)
+
+    try:
+        INIT_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        INIT_CACHE_PATH.touch()
+    except OSError:
+        pass
+    return True, SUCCESS_MSG
+
+
+def check_real_data() -> bool:
+    """Return True if the backend will get REAL satellite data."""
+    return diagnose()[0]
+
 
+if __name__ == "__main__":
+    ok, report = diagnose()
+    print(report, end="")
+    raise SystemExit(0 if ok else 1)
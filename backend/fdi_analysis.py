@@ -0,0 +1,49 @@
+"""
+FDI pollution levels for OceanEye
+Shared by satellite_monitor and main.py's mock-data path, so both grade FDI the same way
+"""
+from typing import Any, Dict, Sequence, Union
+
+import numpy as np
+
+# Upper FDI bound (exclusive) of each pollution level; anything above the last edge is level 5
+_LEVELS = np.array([0.2, 0.4, 0.6, 0.8])
+FDI_STATUSES = ('excellent', 'good', 'moderate', 'poor', 'critical')
+# Change between the first and last three samples' averages that counts as a trend
+FDI_TREND_DELTA = 0.05
+
+
+def analyze_pollution_level(fdi_values: Union[Sequence[float], np.ndarray]) -> Dict[str, Any]:
+    """Grade a series of FDI values: pollution status/level from the average, trend from the ends"""
+
+    if not len(fdi_values):
+        return {
+            'status': 'unknown',
+            'level': 0,
+            'trend': 'stable'
+        }
+
+    fdi = np.asarray(fdi_values, dtype=np.float64)
+    avg_fdi = float(fdi.mean())
+    recent_avg = float(fdi[-3:].mean())
+    older_avg = float(fdi[:3].mean())
+
+    # Determine pollution level
+    level = int(np.searchsorted(_LEVELS, avg_fdi, side='right')) + 1
+    status = FDI_STATUSES[level - 1]
+
+    # Determine trend
+    if recent_avg > older_avg + FDI_TREND_DELTA:
+        trend = 'worsening'
+    elif recent_avg < older_avg - FDI_TREND_DELTA:
+        trend = 'improving'
+    else:
+        trend = 'stable'
+
+    return {
+        'status': status,
+        'level': level,
+        'trend': trend,
+        'avgFdi': round(avg_fdi, 3),
+        'recentAvg': round(recent_avg, 3)
+    }
@@ -0,0 +1,8 @@
+"""
+Gemini reply cleanup for OceanEye
+Shared by main.py and trash-detection/trash_analyzer.py, so both strip replies the same way
+"""
+import re
+
+# Markdown code fences Gemini sometimes wraps JSON in (```json ... ``` or ~~~ ... ~~~)
+FENCE_RE = re.compile(r"^\s*(?:```|~~~)(?:json)?\s*|\s*(?:```|~~~)\s*$", re.IGNORECASE | re.MULTILINE)
@@ -0,0 +1,33 @@
+"""
+Gunicorn config for the OceanHub backend.
+
+  gunicorn -c gunicorn_conf.py main:app
+
+The app is imported once in the master (preload_app) so the YOLO model and the
+helper modules are loaded before forking and shared copy-on-write by every worker.
+Each worker runs a few threads so Gemini / dashboard HTTP calls overlap.
+"""
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:5001")
+preload_app = True
+workers = int(os.environ.get("WEB_CONCURRENCY", max(2, (os.cpu_count() or 2) // 2)))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+# YOLO + Gemini on a large image can take a while
+timeout = 300
+
+
+def when_ready(server):
+    # Runs in the master after the preloaded app import, before workers fork
+    import main
+    main._warm_helper_modules()
+
+
+def post_fork(server, worker):
+    # Split the CPU between workers; by default every worker's torch would use all cores
+    try:
+        import torch  # type: ignore
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+    except Exception:
+        pass
@@ -10,36 +10,55 @@ Features:
 - POST /clear-detections: clear detections on the Next.js dashboard
 
 Run:
-  python main.py --host 0.0.0.0 --port 5001
+  python main.py serve --host 0.0.0.0 --port 5001   # production: gunicorn workers, model loaded once
+  python main.py --host 0.0.0.0 --port 5001         # development server
+  gunicorn -c gunicorn_conf.py main:app             # what `serve` runs
 """
 from __future__ import annotations
 
 import argparse
+import functools
+import io
+import logging
 import os
 import sys
 import time
 import shutil
+from datetime import datetime, timedelta
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Tuple, Dict, Any
+from types import ModuleType
+from typing import Optional, Tuple, Dict, Any, Callable
+import queue
+import sqlite3
 import subprocess
 import threading
+import traceback
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 import json
+import hashlib
 import importlib.util
 
 from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
-from werkzeug.utils import secure_filename
+from werkzeug.utils import safe_join, secure_filename
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import re
 from PIL import Image
 
+from fdi_analysis import analyze_pollution_level
+from gemini_text import FENCE_RE
+
 # Load environment variables (e.g., GEMINI_API_KEY) from trash-detection/config.env if present
 try:
     from dotenv import load_dotenv  # type: ignore
 except Exception:
     load_dotenv = None
+
 # Import satellite monitor
 SATELLITE_AVAILABLE = False
 try:
@@ -63,6 +82,41 @@ except ImportError:
     np = None  # type: ignore
     Image = None  # type: ignore
 
+try:
+    from ultralytics import YOLO  # type: ignore
+except Exception:
+    YOLO = None
+
+try:
+    from flask_compress import Compress  # type: ignore
+except Exception:
+    Compress = None
+
+try:
+    from cachetools import TTLCache  # type: ignore
+except Exception:
+    TTLCache = None
+
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+
+try:
+    from flask.json.provider import DefaultJSONProvider  # Flask >= 2.2
+except Exception:
+    DefaultJSONProvider = None  # type: ignore
+
+
+# Request-path logging; set LOG_LEVEL=DEBUG to include crop details and raw Gemini replies
+logger = logging.getLogger("oceaneye")
+if not logger.handlers:
+    _log_handler = logging.StreamHandler(sys.stderr)
+    _log_handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_log_handler)
+    logger.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+    logger.propagate = False
+
 
 # -----------------------------
 # Path helpers
@@ -74,6 +128,13 @@ DETECTIONS_DIR = FRONTEND_PUBLIC / "detections"
 UPLOADS_DIR = THIS_DIR / "uploads"
 OUTPUTS_DIR = THIS_DIR / "outputs"
 TRASH_DET_DIR = THIS_DIR / "trash-detection"
+GEMINI_CACHE_DIR = THIS_DIR / ".gemini_cache"
+# Cached Gemini replies expire after a month; past GEMINI_CACHE_MAX_ENTRIES the
+# oldest are dropped. Pruning runs at most every GEMINI_CACHE_PRUNE_INTERVAL_S.
+GEMINI_CACHE_MAX_AGE_S = 30 * 24 * 3600
+GEMINI_CACHE_MAX_ENTRIES = 5000
+GEMINI_CACHE_PRUNE_INTERVAL_S = 600
+GEMINI_MODEL = "models/gemini-2.5-flash"
 
 UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
 OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
@@ -92,6 +153,23 @@ if load_dotenv:
         pass
 
 NEXT_DASHBOARD_URL = os.environ.get("DASHBOARD_URL", "http://localhost:3000")
+# One pooled session for dashboard calls so detections reuse the TCP/TLS connection
+HTTP_SESSION = requests.Session()
+_http_adapter = HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.2),
+)
+HTTP_SESSION.mount("http://", _http_adapter)
+HTTP_SESSION.mount("https://", _http_adapter)
+HTTP_SESSION.headers.update({"Connection": "keep-alive"})
+DASHBOARD_SEND_WORKERS = 8
+# Dashboard POSTs run here so /upload-image can return before they finish
+DASHBOARD_POOL = ThreadPoolExecutor(max_workers=DASHBOARD_SEND_WORKERS, thread_name_prefix="dashboard")
+# Crops are only written to trash-detection/.trash_crops when DEBUG_SAVE_CROPS=1,
+# and then off the request thread
+DEBUG_SAVE_CROPS = os.environ.get("DEBUG_SAVE_CROPS") == "1"
+_IO_EXEC = ThreadPoolExecutor(max_workers=2)
 # Use current Python interpreter (works cross-platform)
 PYTHON_BIN = os.environ.get("PYTHON_BIN", sys.executable or "python")
 YOLO_SCRIPT = THIS_DIR / "yolov8_seg_track.py"
@@ -99,45 +177,90 @@ TRASH_ANALYZER_PATH = TRASH_DET_DIR / "trash_analyzer.py"
 SEND_TO_DASHBOARD_PATH = TRASH_DET_DIR / "send_to_dashboard.py"
 MODEL_PATH = THIS_DIR / "best.pt"
 
-JOBS: Dict[str, Dict[str, Any]] = {}
+# Live records, least recently used first; see "Job store" below
+JOBS: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+JOBS_LOCK = threading.Lock()
+MAX_JOBS = 512
 FIXED_OUTPUT_NAME = "output.mp4"
+# Reject request bodies larger than this before werkzeug starts parsing them
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_MB", "1024")) * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+IMAGE_MIME_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".webp": "image/webp"}
+
+# Load the segmentation model once per process instead of once per image.
+# Ultralytics models are not safe to call from several threads at once, so
+# inference goes through YOLO_LOCK.
+YOLO_MODEL = None
+YOLO_LOCK = threading.Lock()
+if YOLO is not None and MODEL_PATH.exists():
+    try:
+        YOLO_MODEL = YOLO(str(MODEL_PATH))
+        print(f"✓ YOLO model loaded from {MODEL_PATH}")
+    except Exception as e:
+        print(f"⚠ Failed to load YOLO model (will load per request): {e}")
 
 # -----------------------------
 # Utilities
 # -----------------------------
+# Image extension with stray trailing digits, e.g. ".png1"
+_EXT_DIGITS_RE = re.compile(r"\.(png|jpe?g|webp)\d+$", re.IGNORECASE)
+# Progress lines written by yolov8_seg_track.py: group 1 is the percent when the frame
+# total is known, group 2 the frame count when it isn't
+PROGRESS_RE = re.compile(rb"Progress:\s+(?:\d+/\d+\s+frames\s+\(([\d.]+)%\)|(\d+)\s+frames processed)")
+# Outermost JSON object/array in a reply that wraps it in prose
+_JSON_BODY_RE = re.compile(r"\{.*\}|\[.*\]", re.DOTALL)
+
 def _sanitize_ext(ext: str) -> str:
     ext = (ext or "").lower()
     if ext in {".png", ".jpg", ".jpeg", ".webp"}:
         return ext
     # If it looks like ".png1", strip trailing digits and re-check
-    import re as _re
-    m = _re.match(r"\.(png|jpe?g|webp)\d+$", ext, flags=_re.IGNORECASE)
+    m = _EXT_DIGITS_RE.match(ext)
     if m:
         base = "." + m.group(1).lower()
         return base if base in {".png", ".jpg", ".jpeg", ".webp"} else ".png"
     return ".png"
 
-def _normalize_public_image_url(url_path: str) -> str:
-    s = (url_path or "").strip()
-    if not s.startswith("/"):
-        s = "/" + s
-    try:
-        import re as _re
-        s = _re.sub(r"\.(png|jpe?g|webp)\d+$", lambda m: "." + m.group(1), s, flags=_re.IGNORECASE)
-    except Exception:
-        pass
-    return s
+def _save_upload(file, dest_path: Path) -> None:
+    """
+    Stream an uploaded file to disk in 1 MiB chunks.
+    FileStorage.save() copies with a 16 KiB buffer, which is a lot of Python-level
+    iterations for multi-hundred-MB videos. The chunks are already large, so the
+    file is opened unbuffered to write each one straight through.
+    """
+    with open(dest_path, "wb", buffering=0) as out:
+        shutil.copyfileobj(file.stream, out, UPLOAD_CHUNK_SIZE)
+
+TAIL_BLOCK_SIZE = 8192
 
-def copy_image_to_public(src_path: Path) -> str:
+def tail_file(lp: Path, n: int = 50) -> list[bytes]:
+    """
+    Return the last n lines of a file as raw bytes (with line endings), reading 8 KiB
+    blocks backwards from the end so the cost doesn't grow with the file size.
+    Callers decode only the lines they keep.
     """
-    Copy image file to frontend/public/detections and return the public URL path.
+    chunks = []
+    newlines = 0
+    with lp.open("rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        # n + 1 newlines guarantees the first of the last n lines is complete
+        while pos > 0 and newlines <= n:
+            step = min(TAIL_BLOCK_SIZE, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            newlines += chunk.count(b"\n")
+            chunks.append(chunk)
+    return b"".join(reversed(chunks)).splitlines(keepends=True)[-n:]
+
+def write_image_to_public(data: bytes, ext: str = ".png") -> str:
+    """
+    Write already-encoded image bytes to frontend/public/detections and return the public URL path.
     """
     DETECTIONS_DIR.mkdir(parents=True, exist_ok=True)
-    timestamp = int(time.time() * 1000)
-    ext = _sanitize_ext(src_path.suffix or ".png")
-    dest_name = f"detection_{timestamp}{ext}"
-    dest_path = DETECTIONS_DIR / dest_name
-    shutil.copy2(src_path, dest_path)
+    dest_name = f"detection_{uuid.uuid4().hex}{_sanitize_ext(ext)}"
+    (DETECTIONS_DIR / dest_name).write_bytes(data)
     return f"/detections/{dest_name}"
 
 
@@ -167,16 +290,146 @@ def send_detection_to_dashboard(
     }
     try:
         api_url = f"{dashboard_url}/api/detections"
-        r = requests.post(api_url, json=payload, timeout=10)
+        r = HTTP_SESSION.post(api_url, json=payload, timeout=10)
         r.raise_for_status()
         return True, None
     except Exception as e:
         return False, str(e)
 
 
-def classify_image_with_gemini(image_path: Path) -> Dict[str, Any]:
+# Fields every detection carries; Gemini's parsed reply is merged over these
+DETECTION_DEFAULTS: Dict[str, Any] = {
+    "label": "Unknown",
+    "threat_level": "Medium",
+    "decomposition_years": 100,
+    "environmental_impact": "Environmental impact data unavailable.",
+    "disposal_instructions": "Disposal instructions unavailable.",
+    "probable_source": "Unknown",
+}
+# Used instead of the parsed reply when Gemini returned nothing usable
+NO_ANALYSIS_FIELDS: Dict[str, Any] = {
+    "environmental_impact": "No structured analysis available.",
+    "disposal_instructions": "Refer to local recycling guidance.",
+}
+
+
+def _load_gemini_json(raw_text: Optional[str]) -> Any:
+    """
+    Parse a Gemini JSON reply, tolerating markdown fences and surrounding prose.
+    Returns None if no JSON can be recovered.
+    """
+    if not raw_text:
+        return None
+    loads = orjson.loads if orjson is not None else json.loads
+    cleaned = FENCE_RE.sub("", raw_text).strip()
+    try:
+        return loads(cleaned)
+    except Exception:
+        pass
+    m = _JSON_BODY_RE.search(cleaned)
+    if m:
+        try:
+            return loads(m.group(0))
+        except Exception:
+            pass
+    return None
+
+
+def _parse_gemini_json(raw_text: Optional[str]) -> Dict[str, Any]:
+    """Parse a Gemini JSON reply into a dict; {} if it isn't a JSON object."""
+    data = _load_gemini_json(raw_text)
+    return data if isinstance(data, dict) else {}
+
+
+_GEMINI_CACHE_PRUNE_LOCK = threading.Lock()
+_GEMINI_CACHE_LAST_PRUNE = 0.0
+
+
+def _prune_gemini_cache() -> None:
+    """Drop expired entries, then the oldest ones past GEMINI_CACHE_MAX_ENTRIES (rate-limited)."""
+    global _GEMINI_CACHE_LAST_PRUNE
+    now = time.time()
+    with _GEMINI_CACHE_PRUNE_LOCK:
+        if now - _GEMINI_CACHE_LAST_PRUNE < GEMINI_CACHE_PRUNE_INTERVAL_S:
+            return
+        _GEMINI_CACHE_LAST_PRUNE = now
+    entries = []
+    for path in GEMINI_CACHE_DIR.glob("*.json"):
+        try:
+            mtime = path.stat().st_mtime
+            if now - mtime > GEMINI_CACHE_MAX_AGE_S:
+                path.unlink()
+            else:
+                entries.append((mtime, path))
+        except OSError:
+            continue
+    entries.sort()
+    for _, path in entries[:max(0, len(entries) - GEMINI_CACHE_MAX_ENTRIES)]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def _cached_gemini(
+    image_bytes: bytes,
+    fetch: Callable[[], Optional[str]],
+    prompt: str,
+    model: str = GEMINI_MODEL,
+    parse: Callable[[Optional[str]], Any] = _parse_gemini_json,
+) -> Tuple[Optional[str], Any]:
     """
-    Call Gemini to classify an image. If not configured, return a sensible fallback.
+    Return (raw_text, parse(raw_text)) for image_bytes, calling fetch() only on a cache miss.
+    Entries live in GEMINI_CACHE_DIR keyed by the SHA-256 of model, prompt and image and
+    expire after GEMINI_CACHE_MAX_AGE_S. Only replies that parse to something non-empty
+    are cached, so a malformed answer is asked again next time.
+    """
+    digest = hashlib.sha256()
+    for part in (model.encode(), prompt.encode(), image_bytes):
+        # Hash each part first so the boundaries between them can't shift
+        digest.update(hashlib.sha256(part).digest())
+    cache_path = GEMINI_CACHE_DIR / f"{digest.hexdigest()}.json"
+    try:
+        with cache_path.open("r", encoding="utf-8") as f:
+            if time.time() - os.fstat(f.fileno()).st_mtime < GEMINI_CACHE_MAX_AGE_S:
+                entry = json.load(f)
+                return entry.get("raw_text"), entry["data"]
+    except Exception:
+        pass
+
+    raw_text = fetch()
+    data = parse(raw_text)
+    if data:
+        try:
+            GEMINI_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+            with tmp_path.open("w", encoding="utf-8") as f:
+                json.dump({"raw_text": raw_text, "data": data}, f)
+            # Atomic rename so concurrent workers never read a half-written entry
+            os.replace(tmp_path, cache_path)
+        except Exception:
+            pass
+        _prune_gemini_cache()
+    return raw_text, data
+
+
+GEMINI_IMAGE_PROMPT = (
+    "Analyze this trash item and respond with a JSON object containing:\n"
+    "{\n"
+    '  "label": "short name (e.g., plastic bottle, fishing net)",\n'
+    '  "threat_level": "Low|Medium|High|Critical",\n'
+    '  "decomposition_years": number,\n'
+    '  "environmental_impact": "description",\n'
+    '  "disposal_instructions": "guidance",\n'
+    '  "probable_source": "likely origin"\n'
+    "}\n"
+    "Respond ONLY with valid JSON."
+)
+
+
+def classify_image_with_gemini_bytes(image_bytes: bytes, mime_type: str = "image/png") -> Dict[str, Any]:
+    """
+    Call Gemini to classify an encoded image. If not configured, return a sensible fallback.
     """
     api_key = os.environ.get("GEMINI_API_KEY")
     if not api_key or genai is None:
@@ -189,29 +442,15 @@ def classify_image_with_gemini(image_path: Path) -> Dict[str, Any]:
             "probable_source": "Unknown",
         }
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("models/gemini-2.5-flash")
-        prompt = (
-            "Analyze this trash item and respond with a JSON object containing:\n"
-            "{\n"
-            '  "label": "short name (e.g., plastic bottle, fishing net)",\n'
-            '  "threat_level": "Low|Medium|High|Critical",\n'
-            '  "decomposition_years": number,\n'
-            '  "environmental_impact": "description",\n'
-            '  "disposal_instructions": "guidance",\n'
-            '  "probable_source": "likely origin"\n'
-            "}\n"
-            "Respond ONLY with valid JSON."
-        )
-        with open(image_path, "rb") as f:
-            image_bytes = f.read()
-        response = model.generate_content([prompt, {"mime_type": "image/png", "data": image_bytes}])
-        raw = (response.text or "").strip()
-        try:
-            import json as _json
-            cleaned = raw.replace("```json", "").replace("```", "").strip()
-            data = _json.loads(cleaned)
-        except Exception:
+        def _fetch() -> str:
+            genai.configure(api_key=api_key)
+            model = genai.GenerativeModel(GEMINI_MODEL)
+            response = model.generate_content([GEMINI_IMAGE_PROMPT, {"mime_type": mime_type, "data": image_bytes}])
+            return (response.text or "").strip()
+
+        raw, data = _cached_gemini(image_bytes, _fetch, GEMINI_IMAGE_PROMPT)
+        raw = raw or ""
+        if not data:
             # Fallback: label only
             data = {
                 "label": raw[:64] if raw else "Unknown",
@@ -232,19 +471,93 @@ def classify_image_with_gemini(image_path: Path) -> Dict[str, Any]:
             "probable_source": "Unknown",
         }
 
-# Prefer premade analyzer helpers if available
+GEMINI_BATCH_PROMPT = """You will receive {count} images of trash items, in order.
+Respond with a JSON array containing exactly {count} objects, one per image in the same order, each with:
+{{
+  "label": "short name (e.g., plastic bottle, fishing net)",
+  "threat_level": "Low|Medium|High|Critical",
+  "decomposition_years": number (e.g., 450 for plastic bottle),
+  "environmental_impact": "detailed description of harm to marine life and ecosystems",
+  "disposal_instructions": "recycling/disposal guidance",
+  "probable_source": "likely origin (e.g., consumer waste, fishing industry)"
+}}
+
+Respond ONLY with valid JSON, no markdown fences."""
+
+
+def _parse_gemini_batch(raw_text: Optional[str], count: int) -> Optional[list[Dict[str, Any]]]:
+    """Parse a batch reply into `count` dicts, or None if it doesn't line up with the crops."""
+    items = _load_gemini_json(raw_text)
+    if not isinstance(items, list) or len(items) != count:
+        return None
+    if not all(isinstance(item, dict) for item in items):
+        return None
+    return items
+
+
+def classify_crops_with_gemini(crop_images: list[bytes]) -> Optional[list[Dict[str, Any]]]:
+    """
+    Classify all PNG crops with a single Gemini request.
+    Returns one analysis dict per crop (same order), or None if Gemini isn't configured,
+    the call fails, or the reply can't be aligned with the crops.
+    """
+    api_key = os.environ.get("GEMINI_API_KEY")
+    if not crop_images or not api_key or genai is None:
+        return None
+
+    prompt = GEMINI_BATCH_PROMPT.format(count=len(crop_images))
+
+    def _fetch() -> str:
+        genai.configure(api_key=api_key)
+        model = genai.GenerativeModel(GEMINI_MODEL)
+        parts: list[Any] = [prompt]
+        parts.extend({"mime_type": "image/png", "data": data} for data in crop_images)
+        response = model.generate_content(parts)
+        return (response.text or "").strip()
+
+    # Key the batch on the ordered per-crop hashes
+    batch_key = b"".join(hashlib.sha256(data).digest() for data in crop_images)
+    try:
+        _, items = _cached_gemini(
+            batch_key, _fetch, prompt,
+            parse=functools.partial(_parse_gemini_batch, count=len(crop_images)),
+        )
+    except Exception as e:
+        logger.warning(f"[classify_crops] Gemini batch call failed: {e}")
+        return None
+    return items
+
+
+# Prefer premade analyzer helpers if available.
+# Loaded modules are cached per (name, path) and only re-executed when the file's mtime changes.
+_MODULE_CACHE: Dict[Tuple[str, str], Tuple[float, ModuleType]] = {}
+_MODULE_CACHE_LOCK = threading.Lock()
+
 def _load_module_from_path(mod_name: str, file_path: Path):
     try:
-        spec = importlib.util.spec_from_file_location(mod_name, str(file_path))
-        if spec and spec.loader:
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)  # type: ignore[attr-defined]
-            return module
+        key = (mod_name, str(file_path))
+        mtime = file_path.stat().st_mtime
+        with _MODULE_CACHE_LOCK:
+            cached = _MODULE_CACHE.get(key)
+            if cached and cached[0] == mtime:
+                return cached[1]
+            spec = importlib.util.spec_from_file_location(mod_name, str(file_path))
+            if spec and spec.loader:
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)  # type: ignore[attr-defined]
+                _MODULE_CACHE[key] = (mtime, module)
+                return module
     except Exception:
         return None
     return None
 
-def classify_image_with_premade(image_path: Path) -> Dict[str, Any]:
+def _warm_helper_modules() -> None:
+    """Import the helper scripts up front so the first request doesn't pay for it."""
+    _load_module_from_path("yolo_segment_mod", TRASH_DET_DIR / "yolo_segment.py")
+    _load_module_from_path("trash_analyzer_mod", TRASH_ANALYZER_PATH)
+    _load_module_from_path("send_to_dashboard_mod", SEND_TO_DASHBOARD_PATH)
+
+def classify_image_with_premade(image_bytes: bytes, mime_type: str = "image/png") -> Dict[str, Any]:
     """
     Use backend/trash-detection/trash_analyzer.py's classify_with_gemini on the full frame.
     Falls back to local classify_image_with_gemini if import fails.
@@ -252,41 +565,24 @@ def classify_image_with_premade(image_path: Path) -> Dict[str, Any]:
     trash_analyzer = _load_module_from_path("trash_analyzer_mod", TRASH_ANALYZER_PATH)
     if trash_analyzer and hasattr(trash_analyzer, "classify_with_gemini"):
         try:
-            img = Image.open(image_path).convert("RGB")
-            label, raw_text, _prompt = trash_analyzer.classify_with_gemini(img)  # type: ignore[attr-defined]
-            data: Dict[str, Any] = {}
-            if raw_text:
-                try:
-                    clean = raw_text.replace("```json", "").replace("```", "").strip()
-                    data = json.loads(clean)
-                except Exception:
-                    data = {}
-            if not data:
-                data = {
-                    "label": (label or "Unknown"),
-                    "threat_level": "Medium",
-                    "decomposition_years": 100,
-                    "environmental_impact": "No structured analysis available.",
-                    "disposal_instructions": "Refer to local recycling guidance.",
-                    "probable_source": "Unknown",
-                }
-            return {
-                "label": data.get("label", label or "Unknown"),
-                "threat_level": data.get("threat_level", "Medium"),
-                "decomposition_years": data.get("decomposition_years", 100),
-                "environmental_impact": data.get("environmental_impact", "Environmental impact data unavailable."),
-                "disposal_instructions": data.get("disposal_instructions", "Disposal instructions unavailable."),
-                "probable_source": data.get("probable_source", "Unknown"),
-            }
+            # Full frames go over as uploaded; only PIL crops get the 512 px JPEG cap
+            raw_text, data = _cached_gemini(
+                image_bytes,
+                lambda: trash_analyzer.classify_with_gemini(image_bytes, mime_type=mime_type)[1],  # type: ignore[attr-defined]
+                trash_analyzer.CLASSIFY_PROMPT,  # type: ignore[attr-defined]
+                trash_analyzer.GEMINI_MODEL,  # type: ignore[attr-defined]
+            )
+            label = data.get("label") or raw_text
+            return {**DETECTION_DEFAULTS, "label": label or "Unknown", **(data or NO_ANALYSIS_FIELDS)}
         except Exception:
             pass
-    return classify_image_with_gemini(image_path)
+    return classify_image_with_gemini_bytes(image_bytes, mime_type)
 
 
-def segment_and_classify_frame(image_path: Path) -> list[Dict[str, Any]]:
+def segment_and_classify_frame(image_bytes: bytes, mime_type: str = "image/png") -> list[Dict[str, Any]]:
     """
     Run full pipeline: YOLO segmentation -> crop each object -> classify with Gemini.
-    Returns a list of detections (one per detected object).
+    Takes the encoded image as uploaded. Returns a list of detections (one per detected object).
     """
     detections = []
     
@@ -295,35 +591,39 @@ def segment_and_classify_frame(image_path: Path) -> list[Dict[str, Any]]:
         yolo_seg_path = TRASH_DET_DIR / "yolo_segment.py"
         yolo_seg = _load_module_from_path("yolo_segment_mod", yolo_seg_path)
         if not yolo_seg or not hasattr(yolo_seg, "segment"):
-            print(f"[segment_and_classify] YOLO segment module not found, using fallback", flush=True)
+            logger.warning("[segment_and_classify] YOLO segment module not found, using fallback")
             # Fallback to single full-frame classification
-            return [classify_image_with_premade(image_path)]
+            return [classify_image_with_premade(image_bytes, mime_type)]
         
         # Load trash analyzer for crop + classify
         trash_analyzer = _load_module_from_path("trash_analyzer_mod", TRASH_ANALYZER_PATH)
         if not trash_analyzer:
-            print(f"[segment_and_classify] trash_analyzer not found, using fallback", flush=True)
-            return [classify_image_with_premade(image_path)]
+            logger.warning("[segment_and_classify] trash_analyzer not found, using fallback")
+            return [classify_image_with_premade(image_bytes, mime_type)]
         
-        # Load image
-        img = Image.open(image_path).convert("RGB")
-        img_np = np.array(img)
+        # Load image once; segmentation reads a zero-copy array view, cropping uses the PIL image
+        img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+        img_np = np.asarray(img)
         
         # Run YOLO segmentation
-        print(f"[segment_and_classify] Running YOLO segmentation on {image_path}", flush=True)
-        masks = yolo_seg.segment(img, model_path=str(MODEL_PATH))  # type: ignore[attr-defined]
+        logger.info(f"[segment_and_classify] Running YOLO segmentation on {img.size[0]}x{img.size[1]} image")
+        with YOLO_LOCK:
+            masks = yolo_seg.segment(img_np, model_path=str(MODEL_PATH), model=YOLO_MODEL)  # type: ignore[attr-defined]
         
         if not masks:
-            print(f"[segment_and_classify] No objects detected, using full-frame classification", flush=True)
-            return [classify_image_with_premade(image_path)]
+            logger.info("[segment_and_classify] No objects detected, using full-frame classification")
+            return [classify_image_with_premade(image_bytes, mime_type)]
         
-        print(f"[segment_and_classify] Found {len(masks)} objects", flush=True)
+        logger.info(f"[segment_and_classify] Found {len(masks)} objects")
         
         # Save crops directory
         crops_dir = TRASH_DET_DIR / ".trash_crops"
-        crops_dir.mkdir(parents=True, exist_ok=True)
+        if DEBUG_SAVE_CROPS:
+            crops_dir.mkdir(parents=True, exist_ok=True)
         
-        # Process each mask
+        # Crop every object first so all crops can go to Gemini in one request
+        run_id = uuid.uuid4().hex[:12]  # shared by this image's crop filenames
+        crops = []  # (object index, crop image, crop path, PNG bytes)
         for i, mask in enumerate(masks):
             try:
                 # Crop the object region
@@ -331,92 +631,414 @@ def segment_and_classify_frame(image_path: Path) -> list[Dict[str, Any]]:
                 if crop is None:
                     continue
                 
-                # Save crop for debugging
-                timestamp = int(time.time() * 1000)
-                crop_filename = f"crop_{timestamp}_{i}.png"
-                crop_path = crops_dir / crop_filename
-                crop.save(str(crop_path))
-                print(f"[segment_and_classify] Saved crop {i}: {crop_path}", flush=True)
-                
-                # Classify with Gemini (with verbose logging)
-                print(f"\n{'='*80}", flush=True)
-                print(f"🔍 SENDING TO GEMINI - Object {i+1}/{len(masks)}", flush=True)
-                print(f"{'='*80}", flush=True)
-                print(f"📸 Image size: {crop.size[0]}x{crop.size[1]} pixels", flush=True)
-                print(f"📦 Image format: PNG", flush=True)
-                print(f"💾 Saved to: {crop_path}", flush=True)
-                print(f"\n⏳ Waiting for Gemini response...\n", flush=True)
+                # Encode once; the same PNG bytes go to Gemini, the dashboard and (optionally) disk.
+                # compress_level=1 favours speed over size for these crops.
+                crop_buf = io.BytesIO()
+                crop.save(crop_buf, format="PNG", optimize=False, compress_level=1)
+                crop_bytes = crop_buf.getvalue()
                 
-                label, raw_text, _prompt = trash_analyzer.classify_with_gemini(crop, debug=True)  # type: ignore[attr-defined]
+                # Save crop for debugging
+                crop_path = None
+                if DEBUG_SAVE_CROPS:
+                    crop_path = crops_dir / f"crop_{run_id}_{i}.png"
+                    _IO_EXEC.submit(crop_path.write_bytes, crop_bytes)
+                    logger.debug("[segment_and_classify] Saving crop %d: %s", i, crop_path)
                 
-                print(f"\n{'='*80}", flush=True)
-                print(f"📨 GEMINI RESPONSE - Object {i+1}", flush=True)
-                print(f"{'='*80}", flush=True)
-                if raw_text:
-                    print(f"Raw response ({len(raw_text)} chars):", flush=True)
-                    print(f"{raw_text}", flush=True)
+                crops.append((i, crop, crop_path, crop_bytes))
+            except Exception as e:
+                logger.warning(f"[segment_and_classify] Error cropping mask {i}: {e}")
+                continue
+        
+        # Classify with Gemini
+        logger.info(f"[segment_and_classify] Sending {len(crops)} crop(s) to Gemini in one request")
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, crop, crop_path, _ in crops:
+                logger.debug("[segment_and_classify] Object %d: %dx%d px PNG, saved to %s", i + 1, crop.size[0], crop.size[1], crop_path or "(not saved)")
+        batch = classify_crops_with_gemini([crop_bytes for _, _, _, crop_bytes in crops])
+        if batch is None and crops:
+            logger.info("[segment_and_classify] Batched classification unavailable, classifying crops one by one")
+        
+        for k, (i, crop, crop_path, crop_bytes) in enumerate(crops):
+            try:
+                if batch is not None:
+                    raw_text, data = None, batch[k]
                 else:
-                    print(f"❌ No response received from Gemini", flush=True)
-                print(f"{'='*80}\n", flush=True)
-                
-                # Parse Gemini response
-                data: Dict[str, Any] = {}
-                if raw_text:
-                    try:
-                        clean = raw_text.replace("```json", "").replace("```", "").strip()
-                        data = json.loads(clean)
-                        print(f"✅ Successfully parsed JSON response", flush=True)
-                        print(f"   Label: {data.get('label', 'N/A')}", flush=True)
-                        print(f"   Threat Level: {data.get('threat_level', 'N/A')}", flush=True)
-                        print(f"   Decomposition: {data.get('decomposition_years', 'N/A')} years", flush=True)
-                    except Exception as e:
-                        print(f"⚠️  Failed to parse JSON: {e}", flush=True)
-                        print(f"   Using raw text as label", flush=True)
-                        data = {}
+                    raw_text, data = _cached_gemini(
+                        crop_bytes,
+                        lambda: trash_analyzer.classify_with_gemini(crop_bytes, debug=logger.isEnabledFor(logging.DEBUG))[1],  # type: ignore[attr-defined]
+                        trash_analyzer.CLASSIFY_PROMPT,  # type: ignore[attr-defined]
+                        trash_analyzer.GEMINI_MODEL,  # type: ignore[attr-defined]
+                    )
+                label = data.get("label") or raw_text
                 
+                # Raw replies can be long; only format them when debug logging is on
+                if raw_text and logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("[segment_and_classify] Gemini raw response for object %d (%d chars):\n%s", i + 1, len(raw_text), raw_text)
                 if not data:
-                    data = {
-                        "label": (label or f"Trash Object {i+1}"),
-                        "threat_level": "Medium",
-                        "decomposition_years": 100,
-                        "environmental_impact": "No structured analysis available.",
-                        "disposal_instructions": "Refer to local recycling guidance.",
-                        "probable_source": "Unknown",
-                    }
+                    if raw_text:
+                        logger.warning(f"[segment_and_classify] Object {i}: Gemini reply is not JSON, using raw text as label")
+                    else:
+                        logger.warning(f"[segment_and_classify] Object {i}: no response received from Gemini")
                 
                 detection = {
-                    "label": data.get("label", label or f"Trash Object {i+1}"),
-                    "threat_level": data.get("threat_level", "Medium"),
-                    "decomposition_years": data.get("decomposition_years", 100),
-                    "environmental_impact": data.get("environmental_impact", "Environmental impact data unavailable."),
-                    "disposal_instructions": data.get("disposal_instructions", "Disposal instructions unavailable."),
-                    "probable_source": data.get("probable_source", "Unknown"),
-                    "crop_path": crop_path,  # Keep track of crop path for later copying
+                    **DETECTION_DEFAULTS,
+                    "label": label or f"Trash Object {i+1}",
+                    **(data or NO_ANALYSIS_FIELDS),
+                    "crop_bytes": crop_bytes,  # Encoded crop, written to public/ by upload_image
                 }
                 detections.append(detection)
-                print(f"[segment_and_classify] Object {i}: {detection['label']}", flush=True)
+                logger.info(
+                    f"[segment_and_classify] Object {i}: {detection['label']} "
+                    f"(threat={detection['threat_level']}, decomposition={detection['decomposition_years']} years)"
+                )
                 
             except Exception as e:
-                print(f"[segment_and_classify] Error processing mask {i}: {e}", flush=True)
+                logger.warning(f"[segment_and_classify] Error processing mask {i}: {e}")
                 continue
         
         if not detections:
-            print(f"[segment_and_classify] No valid crops, using full-frame classification", flush=True)
-            return [classify_image_with_premade(image_path)]
+            logger.info("[segment_and_classify] No valid crops, using full-frame classification")
+            return [classify_image_with_premade(image_bytes, mime_type)]
         
         return detections
         
     except Exception as e:
-        print(f"[segment_and_classify] Pipeline failed: {e}", flush=True)
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"[segment_and_classify] Pipeline failed: {e}")
         # Fallback to single full-frame classification
-        return [classify_image_with_premade(image_path)]
+        return [classify_image_with_premade(image_bytes, mime_type)]
+
+
+# -----------------------------
+# Job store
+# -----------------------------
+# JOBS holds the records for jobs this process started (bounded, see _register_job);
+# every change is also written to a SQLite table so status survives restarts and any worker process
+# (gunicorn) can answer polls for any job.
+JOBS_DB_PATH = OUTPUTS_DIR / "jobs.db"
+_JOBS_DB: Optional[sqlite3.Connection] = None
+_JOBS_DB_PID: Optional[int] = None
+_JOBS_DB_LOCK = threading.Lock()
+
+
+def _jobs_db() -> sqlite3.Connection:
+    """Return this process's jobs.db connection (callers hold _JOBS_DB_LOCK)."""
+    global _JOBS_DB, _JOBS_DB_PID
+    # SQLite connections must not cross fork(); reopen in each worker process
+    if _JOBS_DB is None or _JOBS_DB_PID != os.getpid():
+        conn = sqlite3.connect(str(JOBS_DB_PATH), check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, status TEXT, created_at INTEGER, data TEXT NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_created_at ON jobs (created_at)")
+        _JOBS_DB, _JOBS_DB_PID = conn, os.getpid()
+    return _JOBS_DB
+
+
+def _register_job(job: Dict[str, Any]) -> None:
+    """
+    Add a new job to JOBS. Past MAX_JOBS, the least recently used finished jobs are
+    dropped from memory (their records stay in jobs.db) and their log files deleted.
+    """
+    evicted = []
+    with JOBS_LOCK:
+        JOBS[job["id"]] = job
+        if len(JOBS) > MAX_JOBS:
+            for old_id, old_job in list(JOBS.items()):
+                if len(JOBS) <= MAX_JOBS:
+                    break
+                if old_job.get("status") in ("finished", "error"):
+                    evicted.append(JOBS.pop(old_id))
+    for old_job in evicted:
+        _LOG_TAIL_CACHE.pop(old_job["log"], None)
+        paths = [old_job["log"]]
+        if Path(old_job["output"]).name != FIXED_OUTPUT_NAME:
+            paths.append(old_job["output"])
+        for path in paths:
+            try:
+                Path(path).unlink(missing_ok=True)
+            except OSError:
+                pass
+
+
+def _save_job(job: Dict[str, Any]) -> None:
+    """Upsert a job record into jobs.db."""
+    job_id = job["id"]
+    try:
+        with _JOBS_DB_LOCK:
+            _jobs_db().execute(
+                "INSERT INTO jobs (id, status, created_at, data) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(id) DO UPDATE SET status=excluded.status, data=excluded.data",
+                (job_id, job.get("status"), job.get("created_at"), json.dumps(job)),
+            )
+    except Exception as e:
+        logger.warning(f"[JOB {job_id}] Could not persist job record: {e}")
+
+
+def _get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Return the job record from this process, or from jobs.db."""
+    with JOBS_LOCK:
+        job = JOBS.get(job_id)
+        if job is not None:
+            JOBS.move_to_end(job_id)
+            return job
+    try:
+        with _JOBS_DB_LOCK:
+            row = _jobs_db().execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+    except Exception:
+        return None
+
+
+def _list_jobs(limit: int, offset: int) -> list[Dict[str, Any]]:
+    """Newest-first page of job records from jobs.db."""
+    with _JOBS_DB_LOCK:
+        rows = _jobs_db().execute(
+            "SELECT data FROM jobs ORDER BY created_at DESC LIMIT ? OFFSET ?", (limit, offset)
+        ).fetchall()
+    return [json.loads(row[0]) for row in rows]
+
+
+# -----------------------------
+# Background job reaping
+# -----------------------------
+# One reaper thread collects every finished YOLO process instead of parking a
+# watcher thread on proc.wait() per job.
+_ACTIVE_PROCS: Dict[str, Tuple[subprocess.Popen, Any]] = {}  # job_id -> (proc, log file)
+_ACTIVE_PROCS_CV = threading.Condition()
+_REAPER_THREAD: Optional[threading.Thread] = None
+REAPER_POLL_INTERVAL_S = 0.2
+
+
+# log path -> (mtime_ns, size, tail lines, progress); lets polls skip re-reading an unchanged log
+_LOG_TAIL_CACHE: Dict[str, Tuple[int, int, list[str], Optional[float]]] = {}
+
+
+def _log_tail_and_progress(log_path: str) -> Tuple[list[str], Optional[float]]:
+    """Return the last 50 log lines and the latest progress percent parsed from them."""
+    try:
+        st = os.stat(log_path)
+    except OSError:
+        return [], None
+    cached = _LOG_TAIL_CACHE.get(log_path)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2], cached[3]
+    # Tail last ~50 lines, as bytes; progress is matched before anything is decoded
+    tail_lines: list[bytes] = []
+    try:
+        tail_lines = tail_file(Path(log_path), 50)
+    except Exception:
+        pass
+    # Try to parse progress percent from log tail
+    progress_percent: Optional[float] = None
+    for line in reversed(tail_lines):
+        m = PROGRESS_RE.search(line)
+        if not m:
+            continue
+        try:
+            if m.group(1):
+                progress_percent = float(m.group(1))
+            else:
+                # No total available; give a coarse 0-100 estimate if runtime is long
+                frames_done = float(m.group(2))
+                progress_percent = max(1.0, min(99.0, frames_done / 10.0))  # heuristic
+            break
+        except Exception:
+            pass
+    tail_text = [line.decode("utf-8", "ignore") for line in tail_lines]
+    _LOG_TAIL_CACHE[log_path] = (st.st_mtime_ns, st.st_size, tail_text, progress_percent)
+    return tail_text, progress_percent
+
+
+def _output_mtime(job: Dict[str, Any]) -> Optional[int]:
+    """mtime (ns) of the job's output file, or None if it doesn't exist (one stat call)."""
+    try:
+        return os.stat(job["output"]).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _output_url(output_mtime: Optional[int]) -> Optional[str]:
+    # Cache-bust with mtime so the video element reloads
+    if output_mtime is None:
+        return None
+    return f"http://localhost:5001/outputs/{FIXED_OUTPUT_NAME}?v={output_mtime}"
+
+
+def _job_status_payload(job: Dict[str, Any], read_log: bool = True) -> Dict[str, Any]:
+    """
+    Build the /jobs/<id>/status body: the job record plus log tail, progress and output URL.
+    With read_log=False the log isn't touched and log_tail/progress_percent are empty.
+    """
+    tail_lines, progress_percent = _log_tail_and_progress(job["log"]) if read_log else ([], None)
+    if "output_exists" in job:
+        # Memoized by _finish_job; the output no longer changes
+        exists, output_url = job["output_exists"], job["output_url"]
+    else:
+        # Still running: the file may be half-written, so don't hand out a URL yet
+        exists = _output_mtime(job) is not None
+        output_url = None
+    return {
+        **{k: v for k, v in job.items() if not k.startswith("_")},
+        "output_exists": exists,
+        "output_url": output_url,
+        "progress_percent": progress_percent,
+        "log_tail": tail_lines,
+    }
+
+
+def _finish_job(job_id: str, rc: int) -> None:
+    job = JOBS[job_id]
+    job["returncode"] = rc
+    job["ended_at"] = int(time.time() * 1000)
+    output_mtime = _output_mtime(job)
+    job["output_exists"] = output_mtime is not None
+    job["output_mtime"] = output_mtime
+    job["output_url"] = _output_url(output_mtime)
+    if rc == 0 and job["output_exists"]:
+        job["status"] = "finished"
+        logger.info(f"[JOB {job_id}] Finished successfully -> {job['output']}")
+    else:
+        job["status"] = "error"
+        logger.warning(f"[JOB {job_id}] Finished with error rc={rc}")
+    job["_final_response"] = _job_status_payload(job)
+    _LOG_TAIL_CACHE.pop(job["log"], None)
+    _save_job(job)
+
+
+def _reap_jobs() -> None:
+    while True:
+        with _ACTIVE_PROCS_CV:
+            while not _ACTIVE_PROCS:
+                _ACTIVE_PROCS_CV.wait()
+            active = list(_ACTIVE_PROCS.items())
+        for job_id, (proc, log_f) in active:
+            # Popen.poll() is a non-blocking waitpid(pid, WNOHANG) on POSIX
+            rc = proc.poll()
+            if rc is None:
+                continue
+            with _ACTIVE_PROCS_CV:
+                _ACTIVE_PROCS.pop(job_id, None)
+            try:
+                log_f.close()
+            except Exception:
+                pass
+            _finish_job(job_id, rc)
+        time.sleep(REAPER_POLL_INTERVAL_S)
+
+
+def _track_job_process(job_id: str, proc: subprocess.Popen, log_f: Any) -> None:
+    global _REAPER_THREAD
+    with _ACTIVE_PROCS_CV:
+        _ACTIVE_PROCS[job_id] = (proc, log_f)
+        # Started lazily so each (possibly forked) server process gets its own reaper
+        if _REAPER_THREAD is None or not _REAPER_THREAD.is_alive():
+            _REAPER_THREAD = threading.Thread(target=_reap_jobs, name="job-reaper", daemon=True)
+            _REAPER_THREAD.start()
+        _ACTIVE_PROCS_CV.notify()
+
+
+# -----------------------------
+# In-process video jobs
+# -----------------------------
+# Videos are processed one at a time by a worker thread that keeps its YOLO model
+# loaded between jobs, instead of starting a new interpreter (torch import + weight
+# load) per upload. YOLO_JOBS_INPROCESS=0, or an explicit PYTHON_BIN, keeps the
+# subprocess path.
+YOLO_JOBS_INPROCESS = (
+    YOLO is not None
+    and os.environ.get("YOLO_JOBS_INPROCESS", "1") == "1"
+    and "PYTHON_BIN" not in os.environ
+)
+JOB_QUEUE: "queue.Queue[Tuple[str, Path, Path, Path]]" = queue.Queue()
+_JOB_WORKER: Optional[threading.Thread] = None
+_JOB_WORKER_LOCK = threading.Lock()
+# Kept apart from YOLO_MODEL: tracking attaches tracker state to the model's predictor
+_VIDEO_MODEL = None
+
+
+def _video_job_worker() -> None:
+    global _VIDEO_MODEL
+    while True:
+        job_id, input_path, output_path, log_path = JOB_QUEUE.get()
+        rc = 1
+        try:
+            job = JOBS[job_id]
+            job["status"] = "running"
+            _save_job(job)
+            with open(log_path, "a", encoding="utf-8") as log_f:
+                try:
+                    yolo_track = _load_module_from_path("yolov8_seg_track_mod", YOLO_SCRIPT)
+                    if not yolo_track or not hasattr(yolo_track, "run"):
+                        raise RuntimeError(f"Could not load {YOLO_SCRIPT}")
+                    if _VIDEO_MODEL is None:
+                        _VIDEO_MODEL = yolo_track.load_model(str(MODEL_PATH), log_file=log_f)  # type: ignore[attr-defined]
+                    ok = yolo_track.run(input_path, output_path, _VIDEO_MODEL, display=False, log_file=log_f)  # type: ignore[attr-defined]
+                    rc = 0 if ok else 1
+                except Exception:
+                    traceback.print_exc(file=log_f)
+        except Exception as e:
+            logger.warning(f"[JOB {job_id}] Worker error: {e}")
+        finally:
+            _finish_job(job_id, rc)
+            JOB_QUEUE.task_done()
+
+
+def _enqueue_video_job(job_id: str, input_path: Path, output_path: Path, log_path: Path) -> None:
+    global _JOB_WORKER
+    with _JOB_WORKER_LOCK:
+        # Started lazily so each (possibly forked) server process gets its own worker
+        if _JOB_WORKER is None or not _JOB_WORKER.is_alive():
+            _JOB_WORKER = threading.Thread(target=_video_job_worker, name="video-jobs", daemon=True)
+            _JOB_WORKER.start()
+    JOB_QUEUE.put((job_id, input_path, output_path, log_path))
+
+
 # -----------------------------
 # Flask app
 # -----------------------------
 app = Flask(__name__)
+app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_BYTES
 CORS(app, resources={r"*": {"origins": "*"}})
+# Serialize every jsonify() with orjson; types it doesn't know (Decimal, UUID, ...)
+# go through Flask's default encoder hook
+if orjson is not None and DefaultJSONProvider is not None:
+    class ORJSONProvider(DefaultJSONProvider):  # type: ignore[misc, valid-type]
+        def dumps(self, obj: Any, **kwargs: Any) -> str:
+            return orjson.dumps(
+                obj,
+                default=DefaultJSONProvider.default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+            ).decode()
+
+        def loads(self, s: Any, **kwargs: Any) -> Any:
+            return orjson.loads(s)
+
+    app.json = ORJSONProvider(app)
+
+# gzip JSON responses (the satellite time series repeats the same keys hundreds of times)
+if Compress is not None:
+    app.config["COMPRESS_MIMETYPES"] = ["application/json"]
+    app.config["COMPRESS_MIN_SIZE"] = 512
+    Compress(app)
+
+
+def ojsonify(obj: Any, status: int = 200):
+    """
+    jsonify() replacement for the large satellite payloads; serializes with orjson
+    (numpy arrays/scalars included) when it is installed.
+    """
+    if orjson is None:
+        resp = jsonify(obj)
+        resp.status_code = status
+        return resp
+    return app.response_class(
+        orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY),
+        status=status,
+        mimetype="application/json",
+    )
 
 
 @app.get("/health")
@@ -428,9 +1050,6 @@ def health():
 def get_satellite_time_series():
     """Get satellite monitoring time series data"""
     try:
-        from datetime import datetime, timedelta
-        import random
-        
         # Get parameters from query
         start_date = request.args.get('start_date', 
                                       (datetime.now() - timedelta(days=90)).strftime('%Y-%m-%d'))
@@ -449,58 +1068,32 @@ def get_satellite_time_series():
             start = datetime.strptime(start_date, '%Y-%m-%d')
             end = datetime.strptime(end_date, '%Y-%m-%d')
             
-            data = []
-            current = start
+            # One weekly sample per step; draw every index for the whole window at once
+            n = (end - start).days // 7 + 1
+            if n <= 0:
+                raise ValueError("end_date must not be before start_date")
             base_pollution = 0.35
+            rng = np.random.default_rng()
+            ndci = (0.2 + rng.uniform(-0.05, 0.05, n)).round(3)
+            ndwi = (0.4 + rng.uniform(-0.1, 0.1, n)).round(3)
+            ndvi = (0.15 + rng.uniform(-0.05, 0.05, n)).round(3)
+            fdi = (base_pollution + rng.uniform(-0.1, 0.1, n)).round(3)
             
-            while current <= end:
-                data.append({
-                    'date': current.strftime('%Y-%m-%d'),
-                    'ndci': round(0.2 + random.uniform(-0.05, 0.05), 3),
-                    'ndwi': round(0.4 + random.uniform(-0.1, 0.1), 3),
-                    'ndvi': round(0.15 + random.uniform(-0.05, 0.05), 3),
-                    'fdi': round(base_pollution + random.uniform(-0.1, 0.1), 3)
-                })
-                current += timedelta(days=7)
+            data = [
+                {
+                    'date': (start + timedelta(days=7 * k)).strftime('%Y-%m-%d'),
+                    'ndci': a,
+                    'ndwi': b,
+                    'ndvi': c,
+                    'fdi': d,
+                }
+                for k, (a, b, c, d) in enumerate(zip(ndci.tolist(), ndwi.tolist(), ndvi.tolist(), fdi.tolist()))
+            ]
             
             # Calculate analysis
-            fdi_values = [d['fdi'] for d in data]
-            avg_fdi = sum(fdi_values) / len(fdi_values)
-            recent_avg = sum(fdi_values[-3:]) / min(3, len(fdi_values))
-            older_avg = sum(fdi_values[:3]) / min(3, len(fdi_values))
-            
-            if avg_fdi < 0.2:
-                status = 'excellent'
-                level = 1
-            elif avg_fdi < 0.4:
-                status = 'good'
-                level = 2
-            elif avg_fdi < 0.6:
-                status = 'moderate'
-                level = 3
-            elif avg_fdi < 0.8:
-                status = 'poor'
-                level = 4
-            else:
-                status = 'critical'
-                level = 5
-            
-            if recent_avg > older_avg + 0.05:
-                trend = 'worsening'
-            elif recent_avg < older_avg - 0.05:
-                trend = 'improving'
-            else:
-                trend = 'stable'
-            
-            analysis = {
-                'status': status,
-                'level': level,
-                'trend': trend,
-                'avgFdi': round(avg_fdi, 3),
-                'recentAvg': round(recent_avg, 3)
-            }
+            analysis = analyze_pollution_level(fdi)
         
-        return jsonify({
+        return ojsonify({
             "success": True,
             "data": data,
             "analysis": analysis,
@@ -509,65 +1102,87 @@ def get_satellite_time_series():
                 "center": [19.0760, 72.8877]
             },
             "usingMockData": not SATELLITE_AVAILABLE
-        }), 200
+        })
         
     except Exception as e:
         print(f"Error in satellite time series: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
 
+# Sentinel-2 composites change daily at most; keep summaries for 10 minutes so
+# dashboard polling doesn't hit Earth Engine on every request.
+SUMMARY_CACHE_TTL_S = 600
+_SUMMARY_CACHE = TTLCache(maxsize=32, ttl=SUMMARY_CACHE_TTL_S) if TTLCache is not None else None
+_SUMMARY_CACHE_LOCK = threading.RLock()
+
+
+def _satellite_summary_data(start_date: str, end_date: str) -> Tuple[list, Dict[str, Any]]:
+    """Return (data, analysis) for the summary window, served from _SUMMARY_CACHE when fresh."""
+    key = (start_date, end_date)
+    if _SUMMARY_CACHE is not None:
+        with _SUMMARY_CACHE_LOCK:
+            hit = _SUMMARY_CACHE.get(key)
+        if hit is not None:
+            return hit
+    
+    if SATELLITE_AVAILABLE:
+        aoi_coords = [72.775, 18.875, 72.985, 19.255]
+        monitor = get_monitor()
+        data = monitor.get_time_series_data(aoi_coords, start_date, end_date)
+        fdi_values = [d['fdi'] for d in data if d.get('fdi') is not None]
+        analysis = monitor.analyze_pollution_level(fdi_values)
+    else:
+        # Mock data
+        data = [{
+            'date': end_date,
+            'ndci': 0.22,
+            'ndwi': 0.41,
+            'ndvi': 0.16,
+            'fdi': 0.34
+        }]
+        analysis = {
+            'status': 'moderate',
+            'level': 3,
+            'trend': 'stable',
+            'avgFdi': 0.34,
+            'recentAvg': 0.34
+        }
+    
+    if data and _SUMMARY_CACHE is not None:
+        with _SUMMARY_CACHE_LOCK:
+            _SUMMARY_CACHE[key] = (data, analysis)
+    return data, analysis
+
+
 @app.route("/api/satellite/summary", methods=["GET"])
 def get_satellite_summary():
     """Get summary of satellite monitoring data"""
     try:
-        from datetime import datetime, timedelta
-        import random
-        
         # Get last 30 days of data
         end_date = datetime.now().strftime('%Y-%m-%d')
         start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
         
-        if SATELLITE_AVAILABLE:
-            aoi_coords = [72.775, 18.875, 72.985, 19.255]
-            monitor = get_monitor()
-            data = monitor.get_time_series_data(aoi_coords, start_date, end_date)
-            fdi_values = [d['fdi'] for d in data if d.get('fdi') is not None]
-            analysis = monitor.analyze_pollution_level(fdi_values)
-        else:
-            # Mock data
-            data = [{
-                'date': datetime.now().strftime('%Y-%m-%d'),
-                'ndci': 0.22,
-                'ndwi': 0.41,
-                'ndvi': 0.16,
-                'fdi': 0.34
-            }]
-            analysis = {
-                'status': 'moderate',
-                'level': 3,
-                'trend': 'stable',
-                'avgFdi': 0.34,
-                'recentAvg': 0.34
-            }
+        data, analysis = _satellite_summary_data(start_date, end_date)
         
         if not data:
             return jsonify({"error": "No data available"}), 404
         
         latest = data[-1]
         
-        return jsonify({
+        resp = ojsonify({
             "success": True,
             "latest": latest,
             "analysis": analysis,
             "dataPoints": len(data),
             "usingMockData": not SATELLITE_AVAILABLE
-        }), 200
+        })
+        # ETag is a sha1 of the body; pollers that send If-None-Match get an empty 304
+        resp.add_etag()
+        return resp.make_conditional(request)
         
     except Exception as e:
         print(f"Error in satellite summary: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
@@ -597,6 +1212,38 @@ def get_available_cities():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/satellite/tile/<int:z>/<int:x>/<int:y>", methods=["GET"])
+def get_satellite_tile(z: int, x: int, y: int):
+    """
+    Serve one tile of the latest FDI layer through the local tile cache
+    Query params:
+    - city: one of the predefined coastal cities (default: mumbai)
+    
+    Only predefined cities are served, so callers can't make the server fetch
+    (and cache) layers for arbitrary areas.
+    """
+    try:
+        if not SATELLITE_AVAILABLE:
+            return jsonify({"error": "Satellite monitoring unavailable"}), 503
+        from satellite_monitor import COASTAL_CITIES, TILE_MAX_ZOOM
+        
+        city = request.args.get('city', 'mumbai').strip().lower()
+        if city not in COASTAL_CITIES:
+            return jsonify({"error": f"Unknown city: {city}"}), 400
+        if not (0 <= z <= TILE_MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            return jsonify({"error": "Tile out of range"}), 400
+        
+        tile = get_monitor().get_tile(COASTAL_CITIES[city]['coordinates'], z, x, y)
+        if tile is None:
+            return jsonify({"error": "Tile unavailable"}), 404
+        resp = app.response_class(tile, mimetype="image/png")
+        resp.headers["Cache-Control"] = "public, max-age=3600"
+        return resp
+    except Exception as e:
+        print(f"Error serving satellite tile: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route("/api/satellite/analyze", methods=["GET"])
 def analyze_city():
     """
@@ -606,7 +1253,6 @@ def analyze_city():
     - days: number of days to analyze (default: 90)
     """
     try:
-        from datetime import datetime, timedelta
         from satellite_monitor import geocode_city
         
         city_name = request.args.get('city')
@@ -653,7 +1299,7 @@ def analyze_city():
             }
             using_mock = True
         
-        return jsonify({
+        return ojsonify({
             "success": True,
             "location": {
                 "name": location['name'],
@@ -669,13 +1315,12 @@ def analyze_city():
                 "days": days
             },
             "usingMockData": using_mock
-        }), 200
+        })
         
     except ValueError as e:
         return jsonify({"error": f"Invalid parameter: {str(e)}"}), 400
     except Exception as e:
         print(f"Error analyzing city: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
@@ -692,8 +1337,6 @@ def analyze_custom_location():
     }
     """
     try:
-        from datetime import datetime, timedelta
-        
         data = request.get_json()
         if not data:
             return jsonify({"error": "JSON body required"}), 400
@@ -744,7 +1387,7 @@ def analyze_custom_location():
             }
             using_mock = True
         
-        return jsonify({
+        return ojsonify({
             "success": True,
             "location": {
                 "name": location_name,
@@ -759,13 +1402,12 @@ def analyze_custom_location():
                 "days": days
             },
             "usingMockData": using_mock
-        }), 200
+        })
         
     except ValueError as e:
         return jsonify({"error": f"Invalid parameter: {str(e)}"}), 400
     except Exception as e:
         print(f"Error analyzing custom location: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
@@ -781,12 +1423,12 @@ def upload_video():
     if not file:
         return jsonify({"error": "Empty file"}), 400
 
-    filename = secure_filename(file.filename or f"upload_{int(time.time()*1000)}.mp4")
+    filename = secure_filename(file.filename or f"upload_{uuid.uuid4().hex[:12]}.mp4")
     if not filename.lower().endswith(".mp4"):
         return jsonify({"error": "Only MP4 videos are supported"}), 400
 
     input_path = UPLOADS_DIR / filename
-    file.save(str(input_path))
+    _save_upload(file, input_path)
 
     # Fixed output path (overwrite each time)
     output_path = OUTPUTS_DIR / FIXED_OUTPUT_NAME
@@ -800,7 +1442,7 @@ def upload_video():
     # Create job record
     job_id = uuid.uuid4().hex
     log_path = OUTPUTS_DIR / f"job_{job_id}.log"
-    JOBS[job_id] = {
+    job: Dict[str, Any] = {
         "id": job_id,
         "status": "starting",
         "pid": None,
@@ -811,49 +1453,47 @@ def upload_video():
         "created_at": int(time.time() * 1000),
         "ended_at": None,
     }
-    print(f"[JOB {job_id}] Starting process for {input_path}", flush=True)
-
-    # Spawn background process with logs captured
-    args = [
-        str(YOLO_SCRIPT),
-        "--video",
-        str(input_path),
-        "--output",
-        str(output_path),
-        "--no-display",
-        "--model",
-        str(MODEL_PATH),
-    ]
-    try:
-        log_f = open(log_path, "w")
-        proc = subprocess.Popen([PYTHON_BIN, *args], stdout=log_f, stderr=subprocess.STDOUT)
-        JOBS[job_id]["pid"] = proc.pid
-        JOBS[job_id]["status"] = "running"
-    except Exception as e:
-        JOBS[job_id]["status"] = "error"
-        JOBS[job_id]["error"] = f"Failed to start processing: {e}"
-        print(f"[JOB {job_id}] Error starting: {e}", flush=True)
-        return jsonify({"error": JOBS[job_id]["error"], "job_id": job_id}), 500
-
-    # Watcher thread to update status when done
-    def _watch():
-        rc = proc.wait()
-        JOBS[job_id]["returncode"] = rc
-        JOBS[job_id]["ended_at"] = int(time.time() * 1000)
-        if rc == 0 and Path(output_path).exists():
-            JOBS[job_id]["status"] = "finished"
-            print(f"[JOB {job_id}] Finished successfully -> {output_path}", flush=True)
-        else:
-            JOBS[job_id]["status"] = "error"
-            print(f"[JOB {job_id}] Finished with error rc={rc}", flush=True)
+    _register_job(job)
+    logger.info(f"[JOB {job_id}] Starting process for {input_path}")
+
+    if YOLO_JOBS_INPROCESS:
+        # The video worker thread moves the job to running, then finished/error
+        job["status"] = "queued"
+        _save_job(job)
+        _enqueue_video_job(job_id, input_path, output_path, log_path)
+    else:
+        # Spawn background process with logs captured
+        args = [
+            str(YOLO_SCRIPT),
+            "--video",
+            str(input_path),
+            "--output",
+            str(output_path),
+            "--no-display",
+            "--model",
+            str(MODEL_PATH),
+        ]
+        try:
+            log_f = open(log_path, "w")
+            proc = subprocess.Popen([PYTHON_BIN, *args], stdout=log_f, stderr=subprocess.STDOUT)
+            job["pid"] = proc.pid
+            job["status"] = "running"
+            _save_job(job)
+        except Exception as e:
+            job["status"] = "error"
+            job["error"] = f"Failed to start processing: {e}"
+            logger.warning(f"[JOB {job_id}] Error starting: {e}")
+            _save_job(job)
+            return jsonify({"error": job["error"], "job_id": job_id}), 500
 
-    threading.Thread(target=_watch, daemon=True).start()
+        # The shared reaper thread updates the job status when the process exits
+        _track_job_process(job_id, proc, log_f)
 
     return jsonify(
         {
             "started": True,
             "job_id": job_id,
-            "pid": JOBS[job_id]["pid"],
+            "pid": job["pid"],
             "input": str(input_path),
             "output": str(output_path),
             "log": str(log_path),
@@ -862,6 +1502,19 @@ def upload_video():
     )
 
 
+def _log_dashboard_send(idx: int, fut: "Future[bool]") -> None:
+    """Done-callback for background dashboard sends."""
+    try:
+        ok = fut.result()
+    except Exception as e:
+        logger.warning(f"[upload-image] Detection {idx}: Dashboard send failed: {e}")
+        return
+    if ok:
+        logger.info(f"[upload-image] Detection {idx}: Successfully sent to dashboard")
+    else:
+        logger.warning(f"[upload-image] Detection {idx}: Dashboard send failed")
+
+
 @app.post("/upload-image")
 def upload_image():
     """
@@ -874,105 +1527,104 @@ def upload_image():
     if not file:
         return jsonify({"error": "Empty file"}), 400
 
-    filename = secure_filename(file.filename or f"image_{int(time.time()*1000)}.png")
+    filename = secure_filename(file.filename or f"image_{uuid.uuid4().hex[:12]}.png")
     suffix = Path(filename).suffix.lower()
     if suffix not in {".png", ".jpg", ".jpeg", ".webp"}:
         return jsonify({"error": "Unsupported image type"}), 400
 
-    tmp_path = OUTPUTS_DIR / f"tmp_{int(time.time()*1000)}{suffix}"
-    file.save(str(tmp_path))
+    # Images stay in memory: the bytes feed segmentation/Gemini and are written once to public/
+    image_bytes = file.read()
+    mime_type = IMAGE_MIME_TYPES[suffix]
 
     # Run full segmentation + crop + classify pipeline
-    print(f"[upload-image] Starting segmentation pipeline for {tmp_path}", flush=True)
-    detections = segment_and_classify_frame(tmp_path)
-    print(f"[upload-image] Pipeline returned {len(detections)} detection(s)", flush=True)
+    logger.info(f"[upload-image] Starting segmentation pipeline for {filename} ({len(image_bytes)} bytes)")
+    detections = segment_and_classify_frame(image_bytes, mime_type)
+    logger.info(f"[upload-image] Pipeline returned {len(detections)} detection(s)")
 
     # Send each detection to dashboard
     send_helpers = _load_module_from_path("send_to_dashboard_mod", SEND_TO_DASHBOARD_PATH)
     sent_count = 0
     errors = []
     
+    # Copy crops into public/ first. This is quick local I/O, so it stays serial;
+    # only the dashboard POSTs run concurrently.
+    to_send = []  # (idx, public_url, detection)
     for idx, detection in enumerate(detections):
         try:
-            # Copy crop to public (use crop_path if available, otherwise use original image)
-            crop_source = detection.pop("crop_path", tmp_path)
-            
-            public_url = None
-            if send_helpers and hasattr(send_helpers, "copy_image_to_public"):
-                try:
-                    public_url = send_helpers.copy_image_to_public(Path(crop_source))  # type: ignore[attr-defined]
-                    print(f"[upload-image] Detection {idx}: Used premade helper, public_url={public_url}", flush=True)
-                except Exception as e:
-                    print(f"[upload-image] Detection {idx}: Premade helper failed: {e}", flush=True)
-                    public_url = None
-            
-            if not public_url:
-                public_url = copy_image_to_public(Path(crop_source))
-                print(f"[upload-image] Detection {idx}: Used built-in copy, public_url={public_url}", flush=True)
-            
-            # Normalize extension if needed
-            normalized_url = _normalize_public_image_url(public_url)
-            if normalized_url != public_url:
-                try:
-                    old_name = public_url.rsplit("/", 1)[-1]
-                    new_name = normalized_url.rsplit("/", 1)[-1]
-                    old_path = DETECTIONS_DIR / old_name
-                    new_path = DETECTIONS_DIR / new_name
-                    if old_path.exists() and not new_path.exists():
-                        old_path.rename(new_path)
-                    public_url = normalized_url
-                except Exception as e:
-                    print(f"[upload-image] Detection {idx}: Normalization failed: {e}", flush=True)
+            # Write the crop to public (use crop_bytes if available, otherwise the uploaded image)
+            crop_bytes = detection.pop("crop_bytes", None)
+            if crop_bytes:
+                public_url = write_image_to_public(crop_bytes, ".png")
+            else:
+                public_url = write_image_to_public(image_bytes, suffix)
+            logger.info(f"[upload-image] Detection {idx}: public_url={public_url}")
             
             # Verify file exists
             final_filename = public_url.rsplit("/", 1)[-1]
             final_path = DETECTIONS_DIR / final_filename
-            print(f"[upload-image] Detection {idx}: {final_path} exists={final_path.exists()}", flush=True)
-            
-            # Send to dashboard
-            ok = False
-            if send_helpers and hasattr(send_helpers, "send_detection_to_dashboard"):
-                try:
-                    ok = bool(
-                        send_helpers.send_detection_to_dashboard(  # type: ignore[attr-defined]
-                            image_url=public_url,
-                            gemini_data=detection,
-                            confidence=95,
-                            location="Captured Frame",
-                            size="Medium",
-                            dashboard_url=NEXT_DASHBOARD_URL,
-                        )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[upload-image] Detection %d: %s exists=%s", idx, final_path, final_path.exists())
+            to_send.append((idx, public_url, detection))
+                
+        except Exception as e:
+            logger.warning(f"[upload-image] Detection {idx}: Error: {e}")
+            errors.append(f"Detection {idx}: {str(e)}")
+            continue
+
+    def _send_one(item: Tuple[int, str, Dict[str, Any]]) -> bool:
+        idx, public_url, detection = item
+        if send_helpers and hasattr(send_helpers, "send_detection_to_dashboard"):
+            try:
+                return bool(
+                    send_helpers.send_detection_to_dashboard(  # type: ignore[attr-defined]
+                        image_url=public_url,
+                        gemini_data=detection,
+                        confidence=95,
+                        location="Captured Frame",
+                        size="Medium",
+                        dashboard_url=NEXT_DASHBOARD_URL,
+                        session=HTTP_SESSION,
                     )
-                except Exception as e:
-                    print(f"[upload-image] Detection {idx}: Dashboard send failed: {e}", flush=True)
-                    ok = False
-            else:
-                ok, err = send_detection_to_dashboard(
-                    image_url=public_url,
-                    gemini_data=detection,
-                    confidence=95,
-                    location="Captured Frame",
-                    size="Medium",
                 )
-            
+            except Exception as e:
+                logger.warning(f"[upload-image] Detection {idx}: Dashboard send failed: {e}")
+                return False
+        ok, _err = send_detection_to_dashboard(
+            image_url=public_url,
+            gemini_data=detection,
+            confidence=95,
+            location="Captured Frame",
+            size="Medium",
+        )
+        return ok
+
+    # Forward to the dashboard in the background so a slow dashboard doesn't hold the
+    # upload open; ?sync=1 waits for the POSTs and reports how many went through
+    if request.args.get("sync") != "1":
+        for item in to_send:
+            DASHBOARD_POOL.submit(_send_one, item).add_done_callback(
+                functools.partial(_log_dashboard_send, item[0])
+            )
+        res: Dict[str, Any] = {
+            "detections_found": len(detections),
+            "queued_for_dashboard": True,
+            "detections": [{**det, "image_url": url} for _idx, url, det in to_send],
+            "success": bool(to_send),
+        }
+        if errors:
+            res["errors"] = errors
+        return jsonify(res)
+
+    if to_send:
+        results = list(DASHBOARD_POOL.map(_send_one, to_send))
+        for (idx, _url, _det), ok in zip(to_send, results):
             if ok:
                 sent_count += 1
-                print(f"[upload-image] Detection {idx}: Successfully sent to dashboard", flush=True)
+                logger.info(f"[upload-image] Detection {idx}: Successfully sent to dashboard")
             else:
                 errors.append(f"Detection {idx} failed to send")
-                
-        except Exception as e:
-            print(f"[upload-image] Detection {idx}: Error: {e}", flush=True)
-            errors.append(f"Detection {idx}: {str(e)}")
-            continue
-
-    # Clean temp
-    try:
-        tmp_path.unlink(missing_ok=True)
-    except Exception:
-        pass
 
-    res: Dict[str, Any] = {
+    res = {
         "detections_found": len(detections),
         "detections_sent": sent_count,
         "success": sent_count > 0
@@ -986,75 +1638,83 @@ def upload_image():
 def job_status(job_id: str):
     """
     Get job status, including last log tail and whether output exists.
+    Query params:
+    - fields: optional comma-separated list of keys to return, e.g.
+      fields=status,progress_percent,output_url. The log is only read when
+      log_tail or progress_percent is requested.
     """
-    job = JOBS.get(job_id)
+    job = _get_job(job_id)
     if not job:
         return jsonify({"error": "job not found"}), 404
-    # Tail last ~50 lines
-    tail_lines = []
-    try:
-        lp = Path(job["log"])
-        if lp.exists():
-            with lp.open("r", encoding="utf-8", errors="ignore") as f:
-                lines = f.readlines()
-                tail_lines = lines[-50:]
-    except Exception:
-        pass
-    outp = Path(job["output"])
-    exists = outp.exists()
-    # Try to parse progress percent from log tail
-    progress_percent: Optional[float] = None
-    for line in reversed(tail_lines):
-        m = re.search(r"Progress:\s+\d+/\d+\s+frames\s+\(([\d\.]+)%\)", line)
-        if m:
-            try:
-                progress_percent = float(m.group(1))
-                break
-            except Exception:
-                pass
-        m2 = re.search(r"Progress:\s+(\d+)\s+frames processed", line)
-        if m2:
-            # No total available; give a coarse 0-100 estimate if runtime is long
-            try:
-                frames_done = float(m2.group(1))
-                progress_percent = max(1.0, min(99.0, frames_done / 10.0))  # heuristic
-                break
-            except Exception:
-                pass
-    output_url = None
-    if exists:
-        # Cache-bust with mtime so the video element reloads
-        try:
-            mtime = int(outp.stat().st_mtime)
-        except Exception:
-            mtime = int(time.time())
-        output_url = f"http://localhost:5001/outputs/{FIXED_OUTPUT_NAME}?v={mtime}"
-    resp = {
-        **job,
-        "output_exists": exists,
-        "output_url": output_url,
-        "progress_percent": progress_percent,
-        "log_tail": tail_lines,
-    }
-    return jsonify(resp)
+    fields = {f for f in request.args.get("fields", "").split(",") if f} or None
+
+    def _select(payload: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in payload.items() if k in fields} if fields else payload
+
+    if job["status"] in ("finished", "error") and "_final_response" in job:
+        # Terminal jobs never change; serve the payload built when the job ended
+        _LOG_TAIL_CACHE.pop(job["log"], None)
+        resp = jsonify(_select(job["_final_response"]))
+        resp.cache_control.public = True
+        resp.cache_control.max_age = 30
+        if job.get("ended_at"):
+            resp.last_modified = job["ended_at"] / 1000
+        return resp.make_conditional(request)
+    read_log = not fields or "log_tail" in fields or "progress_percent" in fields
+    return jsonify(_select(_job_status_payload(job, read_log=read_log)))
 
 @app.get("/jobs")
 def list_jobs():
-    return jsonify({"jobs": list(JOBS.values())})
+    """
+    List jobs newest first. Query params: limit (default 100, max 1000), offset (default 0).
+    """
+    try:
+        limit = max(1, min(1000, int(request.args.get("limit", 100))))
+        offset = max(0, int(request.args.get("offset", 0)))
+    except ValueError as e:
+        return jsonify({"error": f"Invalid parameter: {str(e)}"}), 400
+    try:
+        jobs = _list_jobs(limit, offset)
+    except Exception as e:
+        logger.warning(f"[jobs] Job store unavailable, listing this process's jobs only: {e}")
+        with JOBS_LOCK:
+            jobs = list(JOBS.values())[offset:offset + limit]
+    # Underscore keys (cached responses) are internal
+    return jsonify({
+        "jobs": [{k: v for k, v in job.items() if not k.startswith("_")} for job in jobs],
+        "limit": limit,
+        "offset": offset,
+    })
 
 @app.get("/outputs/<path:filename>")
 def serve_output(filename: str):
     """
     Serve processed video files from the outputs directory.
     """
-    options: Dict[str, Any] = {"as_attachment": False}
+    # conditional=True gives ETag/Last-Modified and answers Range requests with 206,
+    # so seeking in the video element only fetches the bytes it needs
+    options: Dict[str, Any] = {"as_attachment": False, "conditional": True}
     if filename.lower().endswith(".mp4"):
         options["mimetype"] = "video/mp4"
     resp = send_from_directory(str(OUTPUTS_DIR), filename, **options)
-    # Ensure fresh fetches and CORS visibility for media
     try:
-        resp.headers["Cache-Control"] = "no-store, max-age=0"
-        resp.headers["Access-Control-Expose-Headers"] = "Content-Type, Content-Length"
+        resp.headers["Accept-Ranges"] = "bytes"
+        version = request.args.get("v")
+        try:
+            current = str(os.stat(safe_join(str(OUTPUTS_DIR), filename)).st_mtime_ns)
+        except (OSError, TypeError):
+            current = None
+        if version and version == current:
+            # Finished jobs' URLs carry ?v=<mtime_ns>; while the file still has that
+            # mtime these are exactly the bytes the URL names, so they never change
+            resp.cache_control.public = True
+            resp.cache_control.max_age = 31536000
+            resp.cache_control.immutable = True
+        else:
+            # The fixed output name is overwritten by every job (a stale ?v= means
+            # it already has been); revalidate via ETag
+            resp.cache_control.no_cache = True
+        resp.headers["Access-Control-Expose-Headers"] = "Content-Type, Content-Length, Content-Range, Accept-Ranges"
     except Exception:
         pass
     return resp
@@ -1066,7 +1726,7 @@ def clear_detections():
     Proxy to Next.js to clear detections.
     """
     try:
-        r = requests.delete(f"{NEXT_DASHBOARD_URL}/api/detections", timeout=10)
+        r = HTTP_SESSION.delete(f"{NEXT_DASHBOARD_URL}/api/detections", timeout=10)
         r.raise_for_status()
         return jsonify({"success": True})
     except Exception as e:
@@ -1075,6 +1735,13 @@ def clear_detections():
 
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Unified Flask backend for OceanHub")
+    p.add_argument(
+        "command",
+        nargs="?",
+        choices=["run", "serve"],
+        default="run",
+        help="run: Flask development server (default); serve: gunicorn with gunicorn_conf.py",
+    )
     p.add_argument("--host", type=str, default="0.0.0.0")
     p.add_argument("--port", type=int, default=5001)
     p.add_argument("--debug", action="store_true")
@@ -1083,6 +1750,19 @@ def parse_args() -> argparse.Namespace:
 
 if __name__ == "__main__":
     args = parse_args()
+    if args.command == "serve" and not args.debug:
+        gunicorn_args = [
+            "gunicorn",
+            "--chdir", str(THIS_DIR),
+            "-c", str(THIS_DIR / "gunicorn_conf.py"),
+            "--bind", f"{args.host}:{args.port}",
+            "main:app",
+        ]
+        try:
+            os.execvp("gunicorn", gunicorn_args)
+        except OSError as e:
+            print(f"⚠ Could not start gunicorn ({e}); falling back to the development server")
+    _warm_helper_modules()
     app.run(host=args.host, port=args.port, debug=args.debug)
 
 
@@ -2,12 +2,21 @@
 Satellite Monitoring Module for OceanEye
 Integrates Google Earth Engine for ocean health monitoring
 """
+import hashlib
 import os
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 import json
+import threading
+import time
+import numpy as np
 import requests
 
+from fdi_analysis import analyze_pollution_level
+
 try:
     import ee
     EE_AVAILABLE = True
@@ -15,6 +24,11 @@ except ImportError:
     EE_AVAILABLE = False
     print("Warning: earthengine-api not installed. Satellite features will use mock data.")
 
+try:
+    from cachetools import TTLCache  # type: ignore
+except ImportError:
+    TTLCache = None
+
 # Configuration
 MUMBAI_AOI = {
     'coordinates': [72.775, 18.875, 72.985, 19.255],
@@ -22,6 +36,36 @@ MUMBAI_AOI = {
     'name': 'Mumbai Coast'
 }
 
+# High-volume endpoint: built for many small concurrent compute/getMapId calls
+# and doesn't queue them behind the default endpoint's per-project limits.
+EE_API_URL = os.environ.get('EE_API_URL', 'https://earthengine-highvolume.googleapis.com')
+
+# Sentinel-2 revisits every few days, so an hour-old answer for the same
+# AOI/window (or today's tile layer) is as good as a fresh one
+GEE_CACHE_TTL_S = 3600
+
+# Proxied map tiles: hot tiles in memory, recent ones on disk. Tiles belong to
+# one day's layer, so disk tiles older than a day are never read again and are
+# pruned (as is anything over the byte cap) at most every PRUNE_INTERVAL seconds
+TILE_CACHE_DIR = Path(__file__).resolve().parent / ".tile_cache"
+TILE_CACHE_MEMORY_TILES = 2048
+TILE_CACHE_MAX_AGE_S = 24 * 3600
+TILE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+TILE_CACHE_PRUNE_INTERVAL_S = 600
+# Deepest zoom the tile proxy serves (Sentinel-2's 10 m pixels are ~z15)
+TILE_MAX_ZOOM = 18
+
+# Per-image index means already fetched from GEE, one JSON file per AOI/scale,
+# so repeat queries over overlapping windows only fetch the days not seen yet
+SERIES_STORE_DIR = Path(__file__).resolve().parent / ".series_cache"
+# Bumped when the store layout changes; stores in another format are refetched
+SERIES_STORE_VERSION = 2
+# Recent days may still gain scenes; they are re-fetched until this old
+SERIES_SETTLE_DAYS = 5
+
+# Bands added by SatelliteMonitor.calculate_indices
+INDEX_BANDS = ['NDCI', 'NDWI', 'NDVI', 'FDI']
+
 # Popular coastal cities with predefined coordinates
 COASTAL_CITIES = {
     'mumbai': {'coordinates': [72.775, 18.875, 72.985, 19.255], 'center': [19.0760, 72.8777]},
@@ -93,16 +137,117 @@ def geocode_city(city_name: str) -> Optional[Dict[str, Any]]:
     
     return None
 
+class TileCache:
+    """Two-level tile store: an in-memory LRU (L1) in front of files under cache_dir (L2)."""
+    
+    def __init__(
+        self,
+        cache_dir: Path,
+        maxsize: int = TILE_CACHE_MEMORY_TILES,
+        max_age_s: float = TILE_CACHE_MAX_AGE_S,
+        max_bytes: int = TILE_CACHE_MAX_BYTES
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.maxsize = maxsize
+        self.max_age_s = max_age_s
+        self.max_bytes = max_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+    
+    def _path(self, key: str) -> Path:
+        # Fan out by prefix so no single directory collects every tile
+        return self.cache_dir / key[:2] / key
+    
+    def _remember(self, key: str, data: bytes) -> None:
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+    
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                return data
+        try:
+            data = self._path(key).read_bytes()
+        except OSError:
+            return None
+        self._remember(key, data)
+        return data
+    
+    def put(self, key: str, data: bytes) -> None:
+        self._remember(key, data)
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+            tmp_path.write_bytes(data)
+            # Atomic rename so concurrent workers never read a half-written tile
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+        self._maybe_prune()
+    
+    def _maybe_prune(self) -> None:
+        now = time.time()
+        with self._lock:
+            if now - self._last_prune < TILE_CACHE_PRUNE_INTERVAL_S:
+                return
+            self._last_prune = now
+        self.prune(now)
+    
+    def prune(self, now: Optional[float] = None) -> None:
+        """Delete disk tiles older than max_age_s, then the oldest ones until under max_bytes."""
+        now = time.time() if now is None else now
+        entries = []
+        try:
+            paths = list(self.cache_dir.glob('*/*'))
+        except OSError:
+            return
+        for path in paths:
+            try:
+                st = path.stat()
+                if now - st.st_mtime > self.max_age_s:
+                    path.unlink()
+                else:
+                    entries.append((st.st_mtime, st.st_size, path))
+            except OSError:
+                continue
+        total = sum(size for _, size, _ in entries)
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+
+
 class SatelliteMonitor:
     """Monitor ocean health using satellite imagery"""
     
     def __init__(self, project_id: Optional[str] = None):
         self.project_id = project_id or os.environ.get('GEE_PROJECT_ID', 'nidaan-ai')
         self.initialized = False
+        # Results of successful GEE queries, keyed by (aoi tuple, start, end, scale)
+        # and (aoi tuple, day) respectively
+        self._series_cache = TTLCache(maxsize=256, ttl=GEE_CACHE_TTL_S) if TTLCache is not None else None
+        self._tile_url_cache = TTLCache(maxsize=256, ttl=GEE_CACHE_TTL_S) if TTLCache is not None else None
+        self._cache_lock = threading.RLock()
+        self.tile_cache = TileCache(TILE_CACHE_DIR)
         
         if EE_AVAILABLE and self.project_id:
             try:
-                ee.Initialize(project=self.project_id)
+                # Skip the credential round-trip if ee was already initialized
+                # in this interpreter (e.g. by check_real_data).
+                if not getattr(ee.data, "_credentials", None):
+                    ee.Initialize(project=self.project_id, opt_url=EE_API_URL)
                 self.initialized = True
                 print(f"✓ Earth Engine initialized with project: {self.project_id}")
             except Exception as e:
@@ -115,29 +260,19 @@ class SatelliteMonitor:
         if not EE_AVAILABLE or not self.initialized:
             return None
             
-        red_edge_band = image.select('B5')
-        red_band = image.select('B4')
-        green_band = image.select('B3')
-        nir_band = image.select('B8')
-        swir1_band = image.select('B11')
-        
+        # normalizedDifference is one server-side op per index, where the
+        # subtract/divide/add form serializes into several pixel functions
         # NDCI - Normalized Difference Chlorophyll Index
-        ndci = red_edge_band.subtract(red_band).divide(
-            red_edge_band.add(red_band)
-        ).rename('NDCI')
+        ndci = image.normalizedDifference(['B5', 'B4']).rename('NDCI')
         
         # NDWI - Normalized Difference Water Index
-        ndwi = green_band.subtract(nir_band).divide(
-            green_band.add(nir_band)
-        ).rename('NDWI')
+        ndwi = image.normalizedDifference(['B3', 'B8']).rename('NDWI')
         
         # NDVI - Normalized Difference Vegetation Index
-        ndvi = nir_band.subtract(red_band).divide(
-            nir_band.add(red_band)
-        ).rename('NDVI')
+        ndvi = image.normalizedDifference(['B8', 'B4']).rename('NDVI')
         
         # FDI - Floating Debris Index
-        fdi = nir_band.subtract(swir1_band).rename('FDI')
+        fdi = image.select('B8').subtract(image.select('B11')).rename('FDI')
         
         return image.addBands([ndci, ndwi, ndvi, fdi])
     
@@ -145,89 +280,204 @@ class SatelliteMonitor:
         self,
         aoi_coords: List[float],
         start_date: str,
-        end_date: str
+        end_date: str,
+        scale_m: int = 100,
+        high_res: bool = False
     ) -> List[Dict[str, Any]]:
-        """Get time series data for indices"""
+        """
+        Get time series data for indices
+        
+        AOI means are taken at scale_m metres per pixel; trend charts look the
+        same at 100 m as at 30 m for ~10x fewer pixels. high_res=True forces
+        the full 30 m analysis scale.
+        """
+        if high_res:
+            scale_m = 30
         
         if not EE_AVAILABLE or not self.initialized:
             # Return mock data for development
             return self._generate_mock_data(start_date, end_date)
         
+        key = (tuple(aoi_coords), start_date, end_date, scale_m)
+        if self._series_cache is not None:
+            with self._cache_lock:
+                hit = self._series_cache.get(key)
+            if hit is not None:
+                return hit
+        
         try:
-            # Define AOI
-            aoi = ee.Geometry.Rectangle(aoi_coords)
-            
-            # Filter Sentinel-2 Harmonized collection (improved dataset)
-            sentinel2 = ee.ImageCollection('COPERNICUS/S2_HARMONIZED') \
-                         .filterBounds(aoi) \
-                         .filterDate(start_date, end_date) \
-                         .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 20)) \
-                         .map(self.calculate_indices)
-            
-            # Reduce to get mean values
-            def reduce_region(image):
-                stats = image.reduceRegion(
-                    reducer=ee.Reducer.mean(),
-                    geometry=aoi,
-                    scale=30,
-                    maxPixels=1e8,
-                    bestEffort=True
-                )
-                return ee.Feature(None, stats).set('date', image.date().format())
-            
-            indices = sentinel2.map(reduce_region).getInfo()['features']
-            
-            # Format data
-            results = []
-            for feature in indices:
-                props = feature['properties']
-                results.append({
-                    'date': props.get('date'),
-                    'ndci': props.get('NDCI'),
-                    'ndwi': props.get('NDWI'),
-                    'ndvi': props.get('NDVI'),
-                    'fdi': props.get('FDI')
-                })
+            results = self._series_from_store(aoi_coords, start_date, end_date, scale_m)
             
+            if self._series_cache is not None:
+                with self._cache_lock:
+                    self._series_cache[key] = results
             return results
             
         except Exception as e:
             print(f"Error fetching satellite data: {e}")
             return self._generate_mock_data(start_date, end_date)
     
-    def _generate_mock_data(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
-        """Generate realistic mock data for development"""
-        import random
-        from datetime import datetime, timedelta
+    def _fetch_time_series(
+        self,
+        aoi_coords: List[float],
+        start_date: str,
+        end_date: str,
+        scale_m: int
+    ) -> List[Dict[str, Any]]:
+        """Query GEE for per-image index means over [start_date, end_date)"""
+        # Define AOI
+        aoi = ee.Geometry.Rectangle(aoi_coords)
         
-        start = datetime.strptime(start_date, '%Y-%m-%d')
-        end = datetime.strptime(end_date, '%Y-%m-%d')
+        # Filter Sentinel-2 Harmonized collection (improved dataset)
+        sentinel2 = ee.ImageCollection('COPERNICUS/S2_HARMONIZED') \
+                     .filterBounds(aoi) \
+                     .filterDate(start_date, end_date) \
+                     .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', 20))
         
-        results = []
-        current = start
+        # Stack every date's indices into one image and reduce it once, so
+        # GEE answers with a single dict instead of one feature per image.
+        # Bands come back as "<system:index>_<INDEX>".
+        stacked = sentinel2.map(self.calculate_indices) \
+                           .select(INDEX_BANDS) \
+                           .toBands()
+        stats = ee.Algorithms.If(
+            sentinel2.size().gt(0),
+            stacked.reduceRegion(
+                reducer=ee.Reducer.mean(),
+                geometry=aoi,
+                scale=scale_m,
+                maxPixels=1e9,
+                bestEffort=True,
+                tileScale=4
+            ),
+            ee.Dictionary({})
+        )
+        payload = ee.Dictionary({
+            'ids': sentinel2.aggregate_array('system:index'),
+            'times': sentinel2.aggregate_array('system:time_start'),
+            'stats': stats,
+        }).getInfo()
         
-        while current <= end:
-            # Generate realistic values with some variation
-            base_pollution = 0.3 + random.uniform(-0.1, 0.1)
-            
+        # Format data
+        stats = payload.get('stats') or {}
+        results = []
+        for image_id, time_start in zip(payload['ids'], payload['times']):
             results.append({
-                'date': current.strftime('%Y-%m-%d'),
-                'ndci': round(0.2 + random.uniform(-0.05, 0.05), 3),  # Chlorophyll
-                'ndwi': round(0.4 + random.uniform(-0.1, 0.1), 3),    # Water
-                'ndvi': round(0.15 + random.uniform(-0.05, 0.05), 3), # Vegetation
-                'fdi': round(base_pollution + random.uniform(-0.1, 0.1), 3)  # Debris
+                'id': image_id,
+                'date': datetime.utcfromtimestamp(time_start / 1000).strftime('%Y-%m-%dT%H:%M:%S'),
+                'ndci': stats.get(f'{image_id}_NDCI'),
+                'ndwi': stats.get(f'{image_id}_NDWI'),
+                'ndvi': stats.get(f'{image_id}_NDVI'),
+                'fdi': stats.get(f'{image_id}_FDI')
             })
-            
-            current += timedelta(days=7)  # Weekly data
-        
         return results
     
+    def _series_from_store(
+        self,
+        aoi_coords: List[float],
+        start_date: str,
+        end_date: str,
+        scale_m: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Serve [start_date, end_date) from the on-disk per-AOI store, querying
+        GEE only for the parts of the window the store hasn't covered yet.
+        
+        The store is one JSON file per (AOI, scale) holding every fetched row,
+        keyed by image id (granules from one datatake share a timestamp), plus
+        the contiguous [start, end) range those rows fully cover. Days
+        inside SERIES_SETTLE_DAYS of today are returned but never marked as
+        covered, since late scenes can still be ingested for them.
+        """
+        digest = hashlib.sha1(f"{tuple(aoi_coords)}:{scale_m}".encode()).hexdigest()
+        path = SERIES_STORE_DIR / f"{digest}.json"
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                store = json.load(f)
+            if store.get('version') != SERIES_STORE_VERSION:
+                raise ValueError("outdated series store")
+            covered_start, covered_end = store['covered']
+            rows = store['rows']
+        except Exception:
+            covered_start = covered_end = None
+            rows = {}
+        
+        if covered_start is None or end_date < covered_start or start_date > covered_end:
+            # Nothing reusable (or not adjacent): fetch the whole window and start over
+            missing = [(start_date, end_date)]
+            rows = {}
+            covered_start, covered_end = start_date, start_date
+        else:
+            missing = []
+            if start_date < covered_start:
+                missing.append((start_date, covered_start))
+            if end_date > covered_end:
+                missing.append((covered_end, end_date))
+        
+        for lo, hi in missing:
+            for row in self._fetch_time_series(aoi_coords, lo, hi, scale_m):
+                rows[row['id']] = row
+        
+        if missing:
+            settled = (datetime.now() - timedelta(days=SERIES_SETTLE_DAYS)).strftime('%Y-%m-%d')
+            covered_start = min(covered_start, start_date)
+            covered_end = max(covered_end, min(end_date, settled))
+            try:
+                SERIES_STORE_DIR.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+                with tmp_path.open("w", encoding="utf-8") as f:
+                    json.dump({'version': SERIES_STORE_VERSION, 'covered': [covered_start, covered_end], 'rows': rows}, f)
+                # Atomic rename so concurrent workers never read a half-written store
+                os.replace(tmp_path, path)
+            except OSError:
+                pass
+        
+        return sorted(
+            (row for row in rows.values() if start_date <= row['date'][:10] < end_date),
+            key=lambda row: row['date']
+        )
+    
+    def _generate_mock_data(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """Generate realistic mock data for development"""
+        start = datetime.strptime(start_date, '%Y-%m-%d')
+        end = datetime.strptime(end_date, '%Y-%m-%d')
+        
+        # One weekly sample per step; draw every index for the whole window at once
+        n = max(0, (end - start).days // 7 + 1)
+        rng = np.random.default_rng()
+        # Columns: ndci (chlorophyll), ndwi (water), ndvi (vegetation), and the
+        # two terms of fdi (debris) = base pollution + per-sample noise
+        base = np.array([0.2, 0.4, 0.15, 0.3, 0.0])
+        spread = np.array([0.05, 0.1, 0.05, 0.1, 0.1])
+        vals = base + rng.uniform(-1.0, 1.0, size=(n, 5)) * spread
+        ndci, ndwi, ndvi = vals[:, :3].round(3).T.tolist()
+        fdi = (vals[:, 3] + vals[:, 4]).round(3).tolist()
+        
+        return [
+            {
+                'date': (start + timedelta(days=7 * k)).strftime('%Y-%m-%d'),
+                'ndci': ndci[k],
+                'ndwi': ndwi[k],
+                'ndvi': ndvi[k],
+                'fdi': fdi[k]
+            }
+            for k in range(n)
+        ]
+    
     def get_latest_image_url(self, aoi_coords: List[float]) -> Optional[str]:
         """Get URL for latest satellite image visualization"""
         
         if not EE_AVAILABLE or not self.initialized:
             return None
         
+        # The 30-day window below only moves once a day
+        key = (tuple(aoi_coords), datetime.now().strftime('%Y-%m-%d'))
+        if self._tile_url_cache is not None:
+            with self._cache_lock:
+                hit = self._tile_url_cache.get(key)
+            if hit is not None:
+                return hit
+        
         try:
             aoi = ee.Geometry.Rectangle(aoi_coords)
             
@@ -252,58 +502,41 @@ class SatelliteMonitor:
                 'palette': ['blue', 'white', 'red']
             })
             
-            return map_id['tile_fetcher'].url_format
+            url = map_id['tile_fetcher'].url_format
+            if self._tile_url_cache is not None:
+                with self._cache_lock:
+                    self._tile_url_cache[key] = url
+            return url
             
         except Exception as e:
             print(f"Error getting image URL: {e}")
             return None
     
-    def analyze_pollution_level(self, fdi_values: List[float]) -> Dict[str, Any]:
-        """Analyze pollution level from FDI values"""
+    def get_tile(self, aoi_coords: List[float], z: int, x: int, y: int) -> Optional[bytes]:
+        """Return PNG bytes for one tile of the latest FDI layer, via the tile cache"""
         
-        if not fdi_values:
-            return {
-                'status': 'unknown',
-                'level': 0,
-                'trend': 'stable'
-            }
-        
-        avg_fdi = sum(fdi_values) / len(fdi_values)
-        recent_avg = sum(fdi_values[-3:]) / min(3, len(fdi_values))
-        older_avg = sum(fdi_values[:3]) / min(3, len(fdi_values))
+        # Tiles belong to the day's layer, same bucket as get_latest_image_url
+        date_bucket = datetime.now().strftime('%Y-%m-%d')
+        key = hashlib.sha1(f"{tuple(aoi_coords)}:{date_bucket}:{z}:{x}:{y}".encode()).hexdigest()
+        data = self.tile_cache.get(key)
+        if data is not None:
+            return data
         
-        # Determine pollution level
-        if avg_fdi < 0.2:
-            status = 'excellent'
-            level = 1
-        elif avg_fdi < 0.4:
-            status = 'good'
-            level = 2
-        elif avg_fdi < 0.6:
-            status = 'moderate'
-            level = 3
-        elif avg_fdi < 0.8:
-            status = 'poor'
-            level = 4
-        else:
-            status = 'critical'
-            level = 5
-        
-        # Determine trend
-        if recent_avg > older_avg + 0.05:
-            trend = 'worsening'
-        elif recent_avg < older_avg - 0.05:
-            trend = 'improving'
-        else:
-            trend = 'stable'
-        
-        return {
-            'status': status,
-            'level': level,
-            'trend': trend,
-            'avgFdi': round(avg_fdi, 3),
-            'recentAvg': round(recent_avg, 3)
-        }
+        url_format = self.get_latest_image_url(aoi_coords)
+        if not url_format:
+            return None
+        try:
+            response = requests.get(url_format.format(z=z, x=x, y=y), timeout=10)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"Error fetching tile {z}/{x}/{y}: {e}")
+            return None
+        self.tile_cache.put(key, response.content)
+        return response.content
+    
+    def analyze_pollution_level(self, fdi_values: List[float]) -> Dict[str, Any]:
+        """Analyze pollution level from FDI values"""
+        return analyze_pollution_level(fdi_values)
 
 
 # Singleton instance
@@ -5,11 +5,19 @@ Run this to verify the satellite monitoring system is working
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
 
 BASE_URL = "http://localhost:5001"
 
+# One pooled session for every test, so calls reuse kept-alive connections
+# (including from the multi-city thread pool)
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(pool_connections=16, pool_maxsize=16))
+SESSION.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
 def print_section(title: str):
     """Print a section header"""
     print("\n" + "="*60)
@@ -21,7 +29,7 @@ def test_get_cities():
     print_section("🌍 Test 1: Get Available Cities")
     
     try:
-        response = requests.get(f"{BASE_URL}/api/satellite/cities")
+        response = SESSION.get(f"{BASE_URL}/api/satellite/cities")
         data = response.json()
         
         if data.get('success'):
@@ -42,7 +50,7 @@ def test_analyze_city(city_name: str, days: int = 90):
     print_section(f"🛰️ Test 2: Analyze {city_name}")
     
     try:
-        response = requests.get(
+        response = SESSION.get(
             f"{BASE_URL}/api/satellite/analyze",
             params={'city': city_name, 'days': days}
         )
@@ -87,7 +95,7 @@ def test_custom_location():
             "days": 60
         }
         
-        response = requests.post(
+        response = SESSION.post(
             f"{BASE_URL}/api/satellite/custom",
             json=payload
         )
@@ -124,23 +132,29 @@ def test_multiple_cities():
     cities = ["Mumbai", "Tokyo", "New York", "Sydney"]
     results = []
     
-    for city in cities:
-        try:
-            response = requests.get(
-                f"{BASE_URL}/api/satellite/analyze",
-                params={'city': city, 'days': 30}
-            )
-            data = response.json()
-            
-            if data.get('success'):
-                results.append({
-                    'city': data['location']['name'].split(',')[0],
-                    'status': data['analysis']['status'],
-                    'level': data['analysis']['level'],
-                    'fdi': data['analysis']['avgFdi']
-                })
-        except:
-            pass
+    # Each analysis waits on Earth Engine, so fetch all cities at once
+    def analyze(city: str) -> Dict[str, Any]:
+        return SESSION.get(
+            f"{BASE_URL}/api/satellite/analyze",
+            params={'city': city, 'days': 30}
+        ).json()
+    
+    with ThreadPoolExecutor(max_workers=len(cities)) as ex:
+        futures = [ex.submit(analyze, city) for city in cities]
+        # Collect in input order so the comparison is the same run to run
+        for fut in futures:
+            try:
+                data = fut.result()
+                
+                if data.get('success'):
+                    results.append({
+                        'city': data['location']['name'].split(',')[0],
+                        'status': data['analysis']['status'],
+                        'level': data['analysis']['level'],
+                        'fdi': data['analysis']['avgFdi']
+                    })
+            except:
+                pass
     
     if results:
         print("✅ Comparison Results:\n")
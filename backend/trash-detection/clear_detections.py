@@ -14,13 +14,16 @@ except ImportError:
     subprocess.run(["pip", "install", "requests"], check=True)
     import requests
 
+# Reused across calls so repeated clears keep the connection alive
+_session = requests.Session()
+
 
 def clear_detections(dashboard_url="http://localhost:3000"):
     """Clear all detections from the dashboard"""
     api_url = f"{dashboard_url}/api/detections"
     
     try:
-        response = requests.delete(api_url, timeout=5)
+        response = _session.delete(api_url, timeout=5)
         response.raise_for_status()
         print("✓ All detections cleared successfully!")
         return True
@@ -11,15 +11,41 @@ from typing import List
 import numpy as np
 from PIL import Image
 
+# Optional: OpenCV's SIMD kernels for the luma + threshold pass
+try:
+    import cv2  # type: ignore
+except ImportError:
+    cv2 = None
+
+# BT.709 luma weights in 8.8 fixed point; they sum to 256, so gray stays gray
+_LUMA_WEIGHTS = (54, 183, 19)
+_LUMA_MATRIX = np.array([[0.2126, 0.7152, 0.0722]], dtype=np.float32)
+
 
 def _to_numpy_rgb(image) -> np.ndarray:
-    # Accept PIL.Image or numpy array
+    # Accept PIL.Image or numpy array; 2-D (grayscale) arrays are returned as-is
     if isinstance(image, Image.Image):
-        return np.array(image.convert("RGB"))
-    arr = np.asarray(image)
-    if arr.ndim == 2:
-        return np.stack([arr, arr, arr], axis=-1)
-    return arr
+        return np.asarray(image if image.mode == "RGB" else image.convert("RGB"))
+    return np.asarray(image)
+
+
+def _luma(rgb: np.ndarray) -> np.ndarray:
+    """BT.709 luma of an RGB image, as uint8 when the input is uint8."""
+    if rgb.ndim == 2:
+        return rgb
+    if rgb.dtype != np.uint8:
+        return 0.2126 * rgb[..., 0] + 0.7152 * rgb[..., 1] + 0.0722 * rgb[..., 2]
+    if cv2 is not None and rgb.shape[-1] == 3:
+        return cv2.transform(np.ascontiguousarray(rgb), _LUMA_MATRIX)
+    # Integer luma in uint16: (54*R + 183*G + 19*B) >> 8 never exceeds 65280
+    wr, wg, wb = _LUMA_WEIGHTS
+    gray = np.multiply(rgb[..., 0], wr, dtype=np.uint16)
+    tmp = np.multiply(rgb[..., 1], wg, dtype=np.uint16)
+    gray += tmp
+    np.multiply(rgb[..., 2], wb, out=tmp, dtype=np.uint16)
+    gray += tmp
+    gray >>= 8
+    return gray
 
 
 def segment(image) -> List[np.ndarray]:
@@ -29,11 +55,14 @@ def segment(image) -> List[np.ndarray]:
     """
     rgb = _to_numpy_rgb(image)
     # Simple luma (BT.709)
-    gray = (0.2126 * rgb[..., 0] + 0.7152 * rgb[..., 1] + 0.0722 * rgb[..., 2]).astype(np.float32)
+    gray = _luma(rgb)
     # Threshold at low brightness to treat “foreground” as not-dark
-    mask = (gray > 35).astype(np.uint8)
+    if cv2 is not None and gray.dtype == np.uint8:
+        _, mask = cv2.threshold(gray, 35, 1, cv2.THRESH_BINARY)
+    else:
+        mask = (gray > 35).view(np.uint8)
     # If everything or nothing is selected, make it empty to avoid false positives
-    on = mask.sum()
+    on = cv2.countNonZero(mask) if cv2 is not None else np.count_nonzero(mask)
     if on == 0 or on == mask.size:
         return []
     return [mask]
@@ -10,19 +10,46 @@ Example:
 """
 
 import argparse
+import atexit
 import json
+import os
+import queue
 import sys
+import threading
 from pathlib import Path
 from typing import Optional
 import shutil
+import uuid
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except ImportError:
     print("Error: 'requests' library not installed. Run: pip install requests")
     sys.exit(1)
 
 
+# One keep-alive pool for every post from this process, so detections sent in
+# quick succession don't each open a fresh connection
+_session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.1),
+)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+
+# Background batching for enqueue_detection(): up to BATCH_MAX payloads per POST,
+# waiting at most BATCH_WAIT_S for a batch to fill once the first one arrives
+BATCH_MAX = 32
+BATCH_WAIT_S = 0.05
+_pending: "queue.Queue[tuple[str, dict]]" = queue.Queue()
+_flusher_thread: Optional[threading.Thread] = None
+_flusher_lock = threading.Lock()
+
+
 def copy_image_to_public(crop_path: Path, public_dir: Optional[Path] = None) -> str:
     """Copy the crop image to Next.js public directory and return the public URL path."""
     if public_dir is None:
@@ -32,20 +59,43 @@ def copy_image_to_public(crop_path: Path, public_dir: Optional[Path] = None) ->
         public_dir = repo_root / "frontend" / "public" / "detections"
     public_dir.mkdir(parents=True, exist_ok=True)
     
-    # Generate unique filename based on timestamp
-    import time
-    timestamp = int(time.time() * 1000)
+    # Generate unique filename; millisecond timestamps collide when several crops are copied at once
     ext = crop_path.suffix
-    public_filename = f"detection_{timestamp}{ext}"
+    public_filename = f"detection_{uuid.uuid4().hex}{ext}"
     public_path = public_dir / public_filename
     
-    # Copy file
-    shutil.copy2(crop_path, public_path)
+    # Hardlink when possible (same filesystem, no bytes copied), else copy the bytes
+    try:
+        os.link(crop_path, public_path)
+    except OSError:
+        shutil.copyfile(crop_path, public_path)
     
     # Return URL path (relative to public/)
     return f"/detections/{public_filename}"
 
 
+def build_payload(
+    image_url: str,
+    gemini_data: dict,
+    confidence: int = 95,
+    location: str = "Unknown",
+    size: str = "Medium",
+) -> dict:
+    """Build the /api/detections request body from Gemini's parsed JSON."""
+    return {
+        "trashType": gemini_data.get("label", "Unknown"),
+        "threatLevel": gemini_data.get("threat_level", "Medium"),
+        "decompositionYears": gemini_data.get("decomposition_years", 100),
+        "environmentalImpact": gemini_data.get("environmental_impact", "Environmental impact data unavailable."),
+        "disposalInstructions": gemini_data.get("disposal_instructions", "Disposal instructions unavailable."),
+        "probableSource": gemini_data.get("probable_source", "Source unknown."),
+        "image": image_url,
+        "confidence": confidence,
+        "location": location,
+        "size": size,
+    }
+
+
 def send_detection_to_dashboard(
     image_url: str,
     gemini_data: dict,
@@ -53,6 +103,7 @@ def send_detection_to_dashboard(
     location: str = "Unknown",
     size: str = "Medium",
     dashboard_url: str = "http://localhost:3000",
+    session: Optional["requests.Session"] = None,
 ) -> bool:
     """
     Send a trash detection to the Next.js dashboard API.
@@ -64,28 +115,16 @@ def send_detection_to_dashboard(
         location: Detection location/zone
         size: Object size (Small/Medium/Large)
         dashboard_url: Base URL of your Next.js dashboard
+        session: Optional requests.Session to post with; defaults to this module's pooled session
     
     Returns:
         True if successful, False otherwise
     """
     api_url = f"{dashboard_url}/api/detections"
-    
-    # Build payload from Gemini data
-    payload = {
-        "trashType": gemini_data.get("label", "Unknown"),
-        "threatLevel": gemini_data.get("threat_level", "Medium"),
-        "decompositionYears": gemini_data.get("decomposition_years", 100),
-        "environmentalImpact": gemini_data.get("environmental_impact", "Environmental impact data unavailable."),
-        "disposalInstructions": gemini_data.get("disposal_instructions", "Disposal instructions unavailable."),
-        "probableSource": gemini_data.get("probable_source", "Source unknown."),
-        "image": image_url,
-        "confidence": confidence,
-        "location": location,
-        "size": size,
-    }
+    payload = build_payload(image_url, gemini_data, confidence, location, size)
     
     try:
-        response = requests.post(api_url, json=payload, timeout=5)
+        response = (session or _session).post(api_url, json=payload, timeout=5)
         response.raise_for_status()
         print(f"✓ Detection sent successfully: {payload['trashType']}")
         return True
@@ -94,6 +133,74 @@ def send_detection_to_dashboard(
         return False
 
 
+def _post_batch(dashboard_url: str, payloads: list) -> None:
+    try:
+        response = _session.post(
+            f"{dashboard_url}/api/detections/batch",
+            json={"detections": payloads},
+            timeout=5,
+        )
+        response.raise_for_status()
+        print(f"✓ Sent {len(payloads)} detection(s)")
+    except requests.exceptions.RequestException as e:
+        print(f"✗ Failed to send {len(payloads)} detection(s): {e}")
+
+
+def _flusher() -> None:
+    """Drain the queue forever, posting whatever has piled up as one batch per dashboard."""
+    while True:
+        batch = [_pending.get()]
+        try:
+            while len(batch) < BATCH_MAX:
+                batch.append(_pending.get(timeout=BATCH_WAIT_S))
+        except queue.Empty:
+            pass
+        by_url: dict = {}
+        for dashboard_url, payload in batch:
+            by_url.setdefault(dashboard_url, []).append(payload)
+        for dashboard_url, payloads in by_url.items():
+            _post_batch(dashboard_url, payloads)
+        for _ in batch:
+            _pending.task_done()
+
+
+def enqueue_detection(
+    image_url: str,
+    gemini_data: dict,
+    confidence: int = 95,
+    location: str = "Unknown",
+    size: str = "Medium",
+    dashboard_url: str = "http://localhost:3000",
+) -> None:
+    """
+    Queue a detection for the dashboard and return immediately.
+
+    A background thread posts queued detections in batches to /api/detections/batch,
+    so callers on a frame loop never wait on the network. Takes the same arguments
+    as send_detection_to_dashboard; call flush_detections() to wait for delivery.
+    """
+    global _flusher_thread
+    with _flusher_lock:
+        if _flusher_thread is None:
+            _flusher_thread = threading.Thread(target=_flusher, name="dashboard-flusher", daemon=True)
+            _flusher_thread.start()
+    _pending.put((dashboard_url, build_payload(image_url, gemini_data, confidence, location, size)))
+
+
+def flush_detections(timeout: float = 5.0) -> bool:
+    """Wait up to timeout seconds for queued detections to be posted; True if all were."""
+    if _flusher_thread is None:
+        return True
+    waiter = threading.Thread(target=_pending.join, daemon=True)
+    waiter.start()
+    waiter.join(timeout)
+    return not waiter.is_alive()
+
+
+# Give queued detections a chance to go out before the interpreter exits
+atexit.register(flush_detections)
+
+
 def parse_args():
     parser = argparse.ArgumentParser(
         description="Send trash detection to Next.js dashboard"
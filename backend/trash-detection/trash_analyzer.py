@@ -6,7 +6,7 @@ Detects NEW trash objects from segmentation masks, crops new objects,
 and sends the crops to Gemini Vision for classification.
 
 Usage:
-  python trash_analyzer.py path/to/image.jpg [--threshold 40] [--seen-store .trash_analyzer_seen.json]
+  python trash_analyzer.py path/to/image.jpg [--threshold 40] [--seen-store .trash_analyzer_seen.npy]
 
 Environment:
   GEMINI_API_KEY=<your_api_key>
@@ -19,6 +19,8 @@ import argparse
 import io
 import json
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Tuple, Optional
 
@@ -35,18 +37,73 @@ except Exception:
     except Exception:
         segment = None  # Will be validated at runtime
 
+# Optional: k-d tree for matching centroids against a long seen history
+try:
+    from scipy.spatial import cKDTree  # type: ignore
+except Exception:
+    cKDTree = None
+
+# Shared Gemini reply helpers live in backend/, one level up when run as a script
+try:
+    from gemini_text import FENCE_RE
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from gemini_text import FENCE_RE
+
+# Gemini model used for classification
+GEMINI_MODEL = "models/gemini-2.5-flash"
+
+# Single-crop prompt for classify_with_gemini
+CLASSIFY_PROMPT = """Analyze this trash item and respond with a JSON object containing:
+{
+  "label": "short name (e.g., plastic bottle, fishing net)",
+  "threat_level": "Low|Medium|High|Critical",
+  "decomposition_years": number (e.g., 450 for plastic bottle),
+  "environmental_impact": "detailed description of harm to marine life and ecosystems",
+  "disposal_instructions": "recycling/disposal guidance",
+  "probable_source": "likely origin (e.g., consumer waste, fishing industry)"
+}
+
+Respond ONLY with valid JSON, no markdown fences."""
+
+# Longest side of crops sent to Gemini
+GEMINI_MAX_CROP_SIDE = 512
+
+# Concurrent per-crop Gemini calls when the batched request isn't usable
+GEMINI_MAX_WORKERS = 8
+
+
+def _bbox_from_mask(mask: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+    """Return (y0, y1, x0, x1) inclusive bounds of mask > 0, or None if empty.
+
+    Projects the mask onto each axis instead of materializing every on-pixel's
+    coordinates, so memory stays O(H + W).
+    """
+    on = mask > 0
+    rows = on.any(axis=1)
+    if not rows.any():
+        return None
+    cols = on.any(axis=0)
+    y0 = int(rows.argmax())
+    y1 = len(rows) - 1 - int(rows[::-1].argmax())
+    x0 = int(cols.argmax())
+    x1 = len(cols) - 1 - int(cols[::-1].argmax())
+    return y0, y1, x0, x1
+
 
 def get_centroid(mask: np.ndarray) -> Optional[Tuple[float, float]]:
     """Return (cx, cy) centroid for mask where mask > 0. Returns None if empty."""
     if mask is None:
         return None
-    # Ensure boolean mask
-    on = np.argwhere(mask > 0)
-    if on.size == 0:
+    on = mask > 0
+    # Per-row / per-column pixel counts weight the axis indices
+    row_counts = on.sum(axis=1)
+    area = int(row_counts.sum())
+    if area == 0:
         return None
-    # on rows are [y, x]
-    cy = float(on[:, 0].mean())
-    cx = float(on[:, 1].mean())
+    col_counts = on.sum(axis=0)
+    cy = float(np.dot(np.arange(len(row_counts)), row_counts) / area)
+    cx = float(np.dot(np.arange(len(col_counts)), col_counts) / area)
     return (cx, cy)
 
 
@@ -68,26 +125,62 @@ def is_new_object(
     return True
 
 
-def load_seen(path: Path) -> List[Tuple[float, float]]:
-    if not path.exists():
-        return []
+def _new_object_filter(seen: np.ndarray, threshold: float):
+    """Return (claim, added): claim(centroid) is True, and records it in added, if it is new.
+
+    The stored (M, 2) history is indexed once in a k-d tree when scipy is
+    available, so each lookup is O(log M); otherwise it is one vectorized
+    distance check. Centroids claimed during this run are few and are checked
+    linearly.
+    """
+    tree = cKDTree(seen) if cKDTree is not None and len(seen) else None
+    added: List[Tuple[float, float]] = []
+
+    def claim(centroid: Tuple[float, float]) -> bool:
+        if tree is not None:
+            dist, _ = tree.query(centroid, k=1)
+        elif len(seen):
+            dist = np.hypot(seen[:, 0] - centroid[0], seen[:, 1] - centroid[1]).min()
+        else:
+            dist = np.inf
+        if dist <= threshold or not is_new_object(centroid, added, threshold=threshold):
+            return False
+        added.append(centroid)
+        return True
+
+    return claim, added
+
+
+def load_seen(path: Path) -> np.ndarray:
+    """Load seen centroids as an (M, 2) float64 array.
+
+    The store is a .npy file next to `path`; a legacy .json list of [x, y]
+    pairs is read once if no .npy exists yet.
+    """
+    npy_path = path.with_suffix(".npy")
     try:
-        with path.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-        # Validate structure
-        result: List[Tuple[float, float]] = []
-        for item in data:
-            if isinstance(item, (list, tuple)) and len(item) == 2:
-                result.append((float(item[0]), float(item[1])))
-        return result
+        if npy_path.exists():
+            return np.load(npy_path).reshape(-1, 2)
+        json_path = path.with_suffix(".json")
+        if json_path.exists():
+            with json_path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            # Validate structure
+            pairs = [item for item in data if isinstance(item, (list, tuple)) and len(item) == 2]
+            return np.asarray(pairs, dtype=np.float64).reshape(-1, 2)
     except Exception:
-        return []
+        pass
+    return np.empty((0, 2), dtype=np.float64)
 
 
-def save_seen(path: Path, seen_objects: List[Tuple[float, float]]) -> None:
+def save_seen(path: Path, seen_objects) -> None:
     try:
-        with path.open("w", encoding="utf-8") as f:
-            json.dump(seen_objects, f)
+        # Write through a handle so np.save doesn't append another suffix
+        with path.with_suffix(".npy").open("wb") as f:
+            np.save(f, np.asarray(seen_objects, dtype=np.float64).reshape(-1, 2))
+        # The .npy now holds everything; drop the legacy store so deleting the
+        # .npy really resets the history
+        path.with_suffix(".json").unlink(missing_ok=True)
     except Exception:
         pass
 
@@ -96,34 +189,95 @@ def crop_mask_region(image: Image.Image, mask: np.ndarray, pad: int = 5) -> Opti
     """Crop the rectangular bounding box of mask>0 from the original image with padding."""
     if mask is None:
         return None
-    coords = np.argwhere(mask > 0)
-    if coords.size == 0:
-        return None
-    ys = coords[:, 0]
-    xs = coords[:, 1]
-    y0, y1 = int(ys.min()), int(ys.max())
-    x0, x1 = int(xs.min()), int(xs.max())
-
-    # Pad and clamp to image bounds
     w, h = image.size
-    x0 = max(0, x0 - pad)
-    y0 = max(0, y0 - pad)
-    x1 = min(w - 1, x1 + pad)
-    y1 = min(h - 1, y1 + pad)
+    bbox = _compute_bbox(mask, pad, w, h)
+    if bbox is None:
+        return None
+    x0, y0, x1, y1 = bbox
 
     # PIL crop box: (left, upper, right, lower); right/lower are exclusive, so +1
     return image.crop((x0, y0, x1 + 1, y1 + 1))
 
 
+def _encode_crop(crop: Image.Image) -> bytes:
+    """Encode a crop for Gemini as JPEG q85, capped at GEMINI_MAX_CROP_SIDE."""
+    # Gemini downsamples large images anyway, and JPEG q85 is several times
+    # smaller than PNG for photographic crops with no loss in label quality
+    if max(crop.size) > GEMINI_MAX_CROP_SIDE or crop.mode != "RGB":
+        crop = crop.convert("RGB")
+        crop.thumbnail((GEMINI_MAX_CROP_SIDE, GEMINI_MAX_CROP_SIDE), Image.LANCZOS)
+    buf = io.BytesIO()
+    crop.save(buf, format="JPEG", quality=85, optimize=True)
+    return buf.getvalue()
+
+
+def classify_batch_with_gemini(
+    crops: List[Image.Image],
+    *,
+    model_name: str = GEMINI_MODEL,
+    debug: bool = False,
+    api_key: Optional[str] = None,
+) -> Optional[List[Optional[str]]]:
+    """
+    Classify all crops with one multi-image Gemini request.
+    Returns one label per crop (same order; None where the reply has no label),
+    or None if Gemini isn't configured or the call/reply fails.
+    """
+    api_key = api_key or os.environ.get("GEMINI_API_KEY")
+    if not crops or not api_key:
+        return None
+    try:
+        import google.generativeai as genai  # type: ignore
+    except Exception:
+        return None
+
+    prompt = (
+        f"You will receive {len(crops)} images of trash items, in order, numbered from 0.\n"
+        "Respond with a JSON array containing one object per image:\n"
+        '[{"index": 0, "label": "short name (e.g., plastic bottle, fishing net)"}, ...]\n\n'
+        "Respond ONLY with valid JSON, no markdown fences."
+    )
+    try:
+        genai.configure(api_key=api_key)
+        model = genai.GenerativeModel(model_name)
+        parts: list = [prompt]
+        parts.extend({"mime_type": "image/jpeg", "data": _encode_crop(crop)} for crop in crops)
+        if debug:
+            print(f"📤 Sending {len(crops)} crop(s) to Gemini API in one request...", flush=True)
+        response = model.generate_content(parts)
+        raw_text = (response.text or "").strip()
+        if debug:
+            print("📥 GEMINI RAW RESPONSE:", flush=True)
+            print("-" * 80, flush=True)
+            print(raw_text, flush=True)
+            print("-" * 80, flush=True)
+        items = json.loads(FENCE_RE.sub("", raw_text).strip())
+    except Exception as e:
+        if debug:
+            print(f"Gemini batch classification failed: {e}")
+        return None
+    if not isinstance(items, list):
+        return None
+
+    labels: List[Optional[str]] = [None] * len(crops)
+    for item in items:
+        if isinstance(item, dict) and isinstance(item.get("index"), int) and 0 <= item["index"] < len(crops):
+            labels[item["index"]] = item.get("label")
+    return labels
+
+
 def classify_with_gemini(
-    crop: Image.Image,
+    crop: Image.Image | bytes,
     *,
-    model_name: str = "models/gemini-2.5-flash",
+    model_name: str = GEMINI_MODEL,
     debug: bool = False,
     api_key: Optional[str] = None,
+    mime_type: str = "image/png",
 ) -> Tuple[Optional[str], Optional[str], str]:
     """
     Send the crop to Gemini Vision to classify the trash type.
+    `crop` may be a PIL image (downscaled and sent as JPEG) or already-encoded
+    bytes, sent unchanged as `mime_type`.
     Returns (label, raw_text, prompt). Label/Raw may be None on failure.
     """
     api_key = api_key or os.environ.get("GEMINI_API_KEY")
@@ -147,25 +301,17 @@ def classify_with_gemini(
         )
         return None, None, prompt
 
-    # Prepare image bytes
-    buf = io.BytesIO()
-    crop.save(buf, format="PNG")
-    image_bytes = buf.getvalue()
+    # Prepare image bytes (callers that already encoded the crop pass them straight through)
+    if isinstance(crop, bytes):
+        image_bytes = crop
+    else:
+        image_bytes = _encode_crop(crop)
+        mime_type = "image/jpeg"
 
     genai.configure(api_key=api_key)
     model = genai.GenerativeModel(model_name)
 
-    prompt = """Analyze this trash item and respond with a JSON object containing:
-{
-  "label": "short name (e.g., plastic bottle, fishing net)",
-  "threat_level": "Low|Medium|High|Critical",
-  "decomposition_years": number (e.g., 450 for plastic bottle),
-  "environmental_impact": "detailed description of harm to marine life and ecosystems",
-  "disposal_instructions": "recycling/disposal guidance",
-  "probable_source": "likely origin (e.g., consumer waste, fishing industry)"
-}
-
-Respond ONLY with valid JSON, no markdown fences."""
+    prompt = CLASSIFY_PROMPT
 
     try:
         if debug:
@@ -175,7 +321,7 @@ Respond ONLY with valid JSON, no markdown fences."""
             print("-" * 80, flush=True)
             print(f"📤 Sending image ({len(image_bytes)} bytes) to Gemini API...", flush=True)
         
-        response = model.generate_content([prompt, {"mime_type": "image/png", "data": image_bytes}])
+        response = model.generate_content([prompt, {"mime_type": mime_type, "data": image_bytes}])
         raw_text = (response.text or "").strip()
         
         if debug:
@@ -187,9 +333,8 @@ Respond ONLY with valid JSON, no markdown fences."""
         
         # Try to parse JSON
         try:
-            import json
             # Strip markdown fences if present
-            clean_text = raw_text.replace("```json", "").replace("```", "").strip()
+            clean_text = FENCE_RE.sub("", raw_text).strip()
             data = json.loads(clean_text)
             label = data.get("label", "Unknown trash")
             return label, raw_text, prompt
@@ -203,14 +348,28 @@ Respond ONLY with valid JSON, no markdown fences."""
         return None, None, prompt
 
 
-def _compute_bbox(mask: np.ndarray, pad: int, img_w: int, img_h: int) -> Optional[Tuple[int, int, int, int]]:
-    coords = np.argwhere(mask > 0)
-    if coords.size == 0:
+def _mask_stats(mask: np.ndarray) -> Optional[Tuple[float, float, Tuple[int, int, int, int], int]]:
+    """Return (cx, cy, (y0, y1, x0, x1), area) for mask > 0, or None if empty.
+
+    Centroid, bounds and area all come from the same per-row / per-column
+    counts, so each mask is thresholded and reduced once instead of once per stat.
+    """
+    on = mask > 0
+    row_counts = on.sum(axis=1)
+    area = int(row_counts.sum())
+    if area == 0:
         return None
-    ys = coords[:, 0]
-    xs = coords[:, 1]
-    y0, y1 = int(ys.min()), int(ys.max())
-    x0, x1 = int(xs.min()), int(xs.max())
+    col_counts = on.sum(axis=0)
+    ys = np.flatnonzero(row_counts)
+    xs = np.flatnonzero(col_counts)
+    cy = float(np.dot(np.arange(len(row_counts)), row_counts) / area)
+    cx = float(np.dot(np.arange(len(col_counts)), col_counts) / area)
+    return cx, cy, (int(ys[0]), int(ys[-1]), int(xs[0]), int(xs[-1])), area
+
+
+def _pad_bbox(bounds: Tuple[int, int, int, int], pad: int, img_w: int, img_h: int) -> Tuple[int, int, int, int]:
+    """Pad (y0, y1, x0, x1) bounds and clamp to the image; returns (x0, y0, x1, y1)."""
+    y0, y1, x0, x1 = bounds
     x0 = max(0, x0 - pad)
     y0 = max(0, y0 - pad)
     x1 = min(img_w - 1, x1 + pad)
@@ -218,6 +377,13 @@ def _compute_bbox(mask: np.ndarray, pad: int, img_w: int, img_h: int) -> Optiona
     return (x0, y0, x1, y1)
 
 
+def _compute_bbox(mask: np.ndarray, pad: int, img_w: int, img_h: int) -> Optional[Tuple[int, int, int, int]]:
+    bounds = _bbox_from_mask(mask)
+    if bounds is None:
+        return None
+    return _pad_bbox(bounds, pad, img_w, img_h)
+
+
 def run(
     image_path: Path,
     threshold: float,
@@ -253,44 +419,61 @@ def run(
         print("No objects detected.")
         return
 
+    claim_new, added = _new_object_filter(seen_objects, threshold)
+    pending: List[Tuple[Tuple[float, float], Image.Image]] = []  # (centroid, crop) per new object
     new_count = 0
     if debug:
         if crops_dir is None:
             crops_dir = Path(".trash_crops")
         Path(crops_dir).mkdir(parents=True, exist_ok=True)
     for i, mask in enumerate(masks):
-        mask_np = np.array(mask)
-        centroid = get_centroid(mask_np)
-        if centroid is None:
+        stats = _mask_stats(np.asarray(mask))
+        if stats is None:
             continue
-        if is_new_object(centroid, seen_objects, threshold=threshold):
+        cx, cy, bounds, area = stats
+        centroid = (cx, cy)
+        if claim_new(centroid):
             new_count += 1
-            seen_objects.append(centroid)
             w, h = img.size
-            bbox = _compute_bbox(mask_np, pad=6, img_w=w, img_h=h)
-            crop = crop_mask_region(img, mask_np, pad=6)
-            area = int(mask_np.sum())
+            bbox = _pad_bbox(bounds, pad=6, img_w=w, img_h=h)
+            x0, y0, x1, y1 = bbox
+            crop = img.crop((x0, y0, x1 + 1, y1 + 1))
             if debug:
                 print(f"Object {i} centroid={centroid} bbox={bbox} area(px)={area}")
-            if crop is None:
-                print(f"Object {i}: unable to crop; centroid={centroid}")
-                continue
             if debug and crops_dir is not None:
-                cx, cy = centroid
                 crop_path = Path(crops_dir) / f"crop_{i}_{int(cx)}_{int(cy)}.png"
                 try:
                     crop.save(crop_path)
                     print(f"Saved crop: {crop_path}")
                 except Exception as e:
                     print(f"Failed to save crop: {e}")
-            label, raw_text, prompt = classify_with_gemini(crop, debug=debug, api_key=api_key)
-            print(f"NEW object at {centroid}: {label or 'Unknown trash'}")
+            pending.append((centroid, crop))
         else:
             # Not new, skip (optional: print verbose)
             pass
 
+    # Classify every new crop in one request; crops the batch reply didn't label
+    # (all of them if the batch call failed) get one call each
+    if pending:
+        labels = classify_batch_with_gemini([crop for _, crop in pending], debug=debug, api_key=api_key)
+        if labels is None:
+            labels = [None] * len(pending)
+        missing = [k for k, label in enumerate(labels) if not label]
+        if missing:
+            # Each call mostly waits on the network, so run them side by side
+            with ThreadPoolExecutor(max_workers=min(GEMINI_MAX_WORKERS, len(missing))) as ex:
+                retried = ex.map(
+                    lambda k: classify_with_gemini(pending[k][1], debug=debug, api_key=api_key)[0],
+                    missing,
+                )
+                for k, label in zip(missing, retried):
+                    labels[k] = label
+        for (centroid, _), label in zip(pending, labels):
+            print(f"NEW object at {centroid}: {label or 'Unknown trash'}")
+
     # Persist seen
-    save_seen(seen_store, seen_objects)
+    if added:
+        save_seen(seen_store, np.vstack([seen_objects, np.asarray(added, dtype=np.float64)]))
     if new_count == 0:
         print("No new objects found.")
 
@@ -302,8 +485,8 @@ def parse_args() -> argparse.Namespace:
     p.add_argument(
         "--seen-store",
         type=str,
-        default=str((Path(__file__).parent / ".trash_analyzer_seen.json")),
-        help="Path to JSON store for seen centroids. Default: .trash_analyzer_seen.json",
+        default=str((Path(__file__).parent / ".trash_analyzer_seen.npy")),
+        help="Path to .npy store for seen centroids (an existing .json store is migrated). Default: .trash_analyzer_seen.npy",
     )
     p.add_argument(
         "--api-key",
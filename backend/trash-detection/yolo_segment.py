@@ -7,6 +7,7 @@ from __future__ import annotations
 from typing import List
 from pathlib import Path
 import os
+import threading
 
 import numpy as np
 from PIL import Image
@@ -17,19 +18,70 @@ try:
 except ImportError:
     YOLO = None
 
+try:
+    import torch  # type: ignore
+except ImportError:
+    torch = None
+
+# FP16 on CUDA halves activation bandwidth and runs the convs on tensor cores;
+# CPU inference stays FP32
+USE_CUDA = torch is not None and torch.cuda.is_available()
+INFER_DEVICE = 0 if USE_CUDA else "cpu"
+
+# Optional: numba fuses the stub's luma + threshold into one pass over the pixels
+try:
+    from numba import njit, prange  # type: ignore
+except ImportError:
+    njit = None
+
+# Loaded models by path, so repeated segment() calls don't re-read the weights
+_MODEL_CACHE: dict = {}
+_MODEL_LOCK = threading.Lock()
 
-def segment(image, model_path: str | None = None) -> List[np.ndarray]:
+# Luma above this counts as "object" in the stub segmentation
+STUB_LUMA_THRESHOLD = 35.0
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _luma_threshold(rgb, out, thr):
+        h, w = out.shape
+        for y in prange(h):
+            for x in range(w):
+                luma = 0.2126 * rgb[y, x, 0] + 0.7152 * rgb[y, x, 1] + 0.0722 * rgb[y, x, 2]
+                out[y, x] = 1 if luma > thr else 0
+else:
+    _luma_threshold = None
+
+
+def _get_model(model_path: str):
+    """Load (and fuse Conv+BN of) the model at model_path once per process."""
+    with _MODEL_LOCK:
+        model = _MODEL_CACHE.get(model_path)
+        if model is None:
+            model = YOLO(model_path)
+            try:
+                model.fuse()
+            except Exception:
+                pass
+            model.to("cuda" if USE_CUDA else "cpu")
+            _MODEL_CACHE[model_path] = model
+        return model
+
+
+def segment(image, model_path: str | None = None, model=None) -> List[np.ndarray]:
     """
     Run YOLOv8 segmentation on an image and return a list of binary masks.
     
     Args:
         image: PIL Image or numpy array (H, W, 3)
         model_path: Path to .pt model file. If None, uses backend/best.pt
+        model: Already-loaded YOLO instance; skips loading model_path when given
     
     Returns:
         List of binary masks (H x W numpy arrays) with 1 for object pixels, 0 otherwise
     """
-    if YOLO is None:
+    if model is None and YOLO is None:
         print("Warning: ultralytics not installed. Falling back to stub segmentation.")
         # Fallback to simple threshold-based segmentation
         return _stub_segment(image)
@@ -39,38 +91,35 @@ def segment(image, model_path: str | None = None) -> List[np.ndarray]:
         script_dir = Path(__file__).resolve().parent
         model_path = str(script_dir.parent / "best.pt")
     
-    if not Path(model_path).exists():
+    if model is None and not Path(model_path).exists():
         print(f"Warning: Model not found at {model_path}. Using stub segmentation.")
         return _stub_segment(image)
     
     # Convert to numpy if needed
     if isinstance(image, Image.Image):
-        img_np = np.array(image.convert("RGB"))
+        img_np = np.asarray(image if image.mode == "RGB" else image.convert("RGB"))
     else:
         img_np = np.asarray(image)
     
     # Load model and run inference
     try:
-        model = YOLO(model_path)
-        results = model(img_np, verbose=False)
+        if model is None:
+            model = _get_model(model_path)
+        results = model(img_np, verbose=False, half=USE_CUDA, device=INFER_DEVICE, imgsz=640)
         
         masks = []
         if results and len(results) > 0:
             result = results[0]
             if hasattr(result, 'masks') and result.masks is not None:
-                # Extract binary masks
-                for mask_data in result.masks.data:
-                    # mask_data is a torch tensor, convert to numpy
-                    mask_np = mask_data.cpu().numpy()
-                    # Resize to original image size if needed
-                    if mask_np.shape != img_np.shape[:2]:
-                        from PIL import Image as PILImage
-                        mask_img = PILImage.fromarray((mask_np * 255).astype(np.uint8))
-                        mask_img = mask_img.resize((img_np.shape[1], img_np.shape[0]), PILImage.NEAREST)
-                        mask_np = (np.array(mask_img) > 127).astype(np.uint8)
-                    else:
-                        mask_np = (mask_np > 0.5).astype(np.uint8)
-                    masks.append(mask_np)
+                # Resize and threshold all masks on the inference device, then
+                # copy them to host memory in one transfer
+                masks_t = result.masks.data
+                h, w = img_np.shape[:2]
+                if tuple(masks_t.shape[-2:]) != (h, w):
+                    masks_t = torch.nn.functional.interpolate(
+                        masks_t.unsqueeze(1).float(), size=(h, w), mode="nearest"
+                    ).squeeze(1)
+                masks = list((masks_t > 0.5).to(torch.uint8).cpu().numpy())
         
         return masks
     except Exception as e:
@@ -85,9 +134,13 @@ def _stub_segment(image) -> List[np.ndarray]:
     else:
         rgb = np.asarray(image)
     
-    # Simple luma threshold
-    gray = (0.2126 * rgb[..., 0] + 0.7152 * rgb[..., 1] + 0.0722 * rgb[..., 2]).astype(np.float32)
-    mask = (gray > 35).astype(np.uint8)
+    # Simple luma threshold (the JIT kernel only handles H x W x 3+ arrays)
+    if _luma_threshold is not None and rgb.ndim == 3 and rgb.shape[2] >= 3:
+        mask = np.empty(rgb.shape[:2], dtype=np.uint8)
+        _luma_threshold(np.ascontiguousarray(rgb), mask, STUB_LUMA_THRESHOLD)
+    else:
+        gray = (0.2126 * rgb[..., 0] + 0.7152 * rgb[..., 1] + 0.0722 * rgb[..., 2]).astype(np.float32)
+        mask = (gray > STUB_LUMA_THRESHOLD).astype(np.uint8)
     on = mask.sum()
     if on == 0 or on == mask.size:
         return []
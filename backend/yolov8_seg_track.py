@@ -1,39 +1,328 @@
 from ultralytics import YOLO
 import cv2
 import argparse
+import json
+import os
 from pathlib import Path
 import sys
+import queue
 import shutil
 import subprocess
+import threading
 
+try:
+	import torch
+	CUDA_AVAILABLE = torch.cuda.is_available()
+except ImportError:
+	CUDA_AVAILABLE = False
 
-def main():
-	# Parse CLI args
-	parser = argparse.ArgumentParser(description="Run YOLOv8 segmentation on a video.")
-	parser.add_argument("--video", type=str, default="/Users/rudra/Documents/Hackathons/OceanHub/manythings.mp4", help="Path to input mp4")
-	parser.add_argument("--output", type=str, default="output_video.mp4", help="Path to save annotated mp4")
-	parser.add_argument("--model", type=str, default=None, help="Path to YOLO model .pt (defaults to backend/best.pt)")
-	parser.add_argument("--no-display", action="store_true", help="Disable GUI window display")
-	parser.add_argument("--prefer-h264", action="store_true", help="Prefer H.264 encoding for better browser compatibility")
-	args = parser.parse_args()
 
-	# 1) Define the path to the input video file
-	video_path = args.video
-	print(f"[YOLO] Starting processing for: {video_path}", flush=True)
+# Frames per model.track() call
+DEFAULT_BATCH_SIZE = 8
+# Inference size; also baked into exported TensorRT engines
+IMGSZ = 640
+# Largest batch an exported engine accepts (exported with dynamic batch)
+ENGINE_MAX_BATCH = 16
+# Run on the first GPU when there is one. On CUDA the model also runs in FP16, so
+# ultralytics uploads each letterboxed uint8 batch and converts/normalizes it to
+# half precision on the device
+DEVICE = 0 if CUDA_AVAILABLE else "cpu"
+# Decoded frames buffered ahead of inference
+QUEUE_DEPTH = 4
+# Static-scene gating (--skip-static): frames whose downsampled grayscale differs
+# from the last tracked frame by less than MOTION_THRESHOLD (mean abs difference,
+# 0-255) reuse its annotation; every STATIC_TRACK_EVERY-th frame is tracked regardless
+# so the tracker keeps up with slow drift
+MOTION_THRESHOLD = 1.5
+MOTION_THUMB_SIZE = (64, 64)
+STATIC_TRACK_EVERY = 15
+# With --resume, the output is encoded in parts of this many frames and a
+# checkpoint is written after each, so a crashed run restarts from the last part
+CHECKPOINT_EVERY = 500
+
+
+def _reset_trackers(model):
+	"""Start fresh trackers so IDs don't carry over when the model is reused for another video."""
+	predictor = getattr(model, "predictor", None)
+	for tracker in getattr(predictor, "trackers", None) or []:
+		tracker.reset()
+
+
+def _put(q, item, stop):
+	"""Put item on q, giving up (False) once stop is set."""
+	while not stop.is_set():
+		try:
+			q.put(item, timeout=0.1)
+			return True
+		except queue.Full:
+			pass
+	return False
+
+
+def _get(q, stop):
+	"""Next item from q; None at end of stream or once stop is set and q is drained."""
+	while True:
+		try:
+			return q.get(timeout=0.1)
+		except queue.Empty:
+			if stop.is_set():
+				return None
+
+
+def _run_stage(target, errors, stop, *args):
+	"""Thread body for a pipeline stage: record its exception and stop the other stages."""
+	try:
+		target(*args)
+	except BaseException as e:
+		errors.append(e)
+		stop.set()
+
+
+def _capture_frames(cap, q_in, stop, adaptive_fps=False, pool=None, start_index=0):
+	"""
+	Capture stage: put (source frame index, frame) on q_in, then the None
+	end-of-stream marker. With adaptive_fps, frames arriving while q_in is full
+	are grabbed but never decoded, so a slow model drops frames instead of
+	falling further behind. Frames are decoded into buffers taken from `pool`
+	when it has one, so steady-state capture doesn't allocate.
+	"""
+	try:
+		source_index = start_index - 1
+		while not stop.is_set():
+			if not cap.grab():
+				# End of video or read error
+				break
+			source_index += 1
+			if adaptive_fps and q_in.full():
+				continue
+			try:
+				buf = pool.get_nowait() if pool is not None else None
+			except queue.Empty:
+				buf = None
+			ret, frame = cap.retrieve(buf)
+			if not ret:
+				break
+			if not _put(q_in, (source_index, frame), stop):
+				break
+	finally:
+		_put(q_in, None, stop)
+
+
+def _motion_thumb(frame):
+	"""Tiny grayscale copy of frame for the static-scene check."""
+	small = cv2.resize(frame, MOTION_THUMB_SIZE, interpolation=cv2.INTER_AREA)
+	return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+
+def _track_frames(model, q_in, q_out, stop, batch_size, skip_static=False, motion_threshold=MOTION_THRESHOLD):
+	"""
+	Inference stage: track frames from q_in in batches of batch_size and pass
+	(source frame index, frame, result) on in order. Trackers live only on this thread; they are
+	reset once per video and every batch tracks with persist=True, so IDs continue
+	across batches. With skip_static, frames that barely differ from the last
+	tracked one are not tracked and go out with result None.
+	"""
+	try:
+		_reset_trackers(model)
+		last_thumb = None
+		skipped = 0
+		eof = False
+		while not eof:
+			batch = []  # (source_index, frame, track it?)
+			while len(batch) < batch_size:
+				item = _get(q_in, stop)
+				if item is None:
+					eof = True
+					break
+				source_index, frame = item
+				track = True
+				if skip_static:
+					thumb = _motion_thumb(frame)
+					if (
+						last_thumb is not None
+						and skipped < STATIC_TRACK_EVERY - 1
+						and cv2.absdiff(thumb, last_thumb).mean() < motion_threshold
+					):
+						track = False
+						skipped += 1
+					else:
+						last_thumb = thumb
+						skipped = 0
+				batch.append((source_index, frame, track))
+			if not batch:
+				break
+			tracked = [frame for _, frame, track in batch if track]
+			results = iter(model.track(tracked, persist=True, verbose=False, device=DEVICE, imgsz=IMGSZ, half=CUDA_AVAILABLE) if tracked else ())
+			for source_index, frame, track in batch:
+				if not _put(q_out, (source_index, frame, next(results) if track else None), stop):
+					return
+	finally:
+		_put(q_out, None, stop)
+
+
+class _FfmpegWriter:
+	"""
+	Encode BGR frames straight to H.264 by piping them into an ffmpeg process,
+	so the output needs no second transcode pass for browser playback.
+	"""
+
+	def __init__(self, ffmpeg, output_path, width, height, fps, log_file=None):
+		cmd = [
+			ffmpeg,
+			"-y",
+			"-loglevel", "error",
+			"-f", "rawvideo",
+			"-pix_fmt", "bgr24",
+			"-s", f"{width}x{height}",
+			"-r", str(fps),
+			"-i", "-",
+			# yuv420p needs even dimensions
+			"-vf", "scale=trunc(iw/2)*2:trunc(ih/2)*2",
+			"-c:v", "libx264",
+			"-preset", "veryfast",
+			"-tune", "zerolatency",
+			"-pix_fmt", "yuv420p",
+			# Faststart helps streaming
+			"-movflags", "+faststart",
+			str(output_path),
+		]
+		# ffmpeg errors go to the job log when it is a real file
+		try:
+			stderr = log_file if log_file is not None and log_file.fileno() >= 0 else None
+		except (AttributeError, OSError, ValueError):
+			stderr = None
+		self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr)
+
+	def write(self, frame):
+		# Hand ffmpeg the frame's own buffer; tobytes() would copy the whole frame first
+		self.proc.stdin.write(frame.data if frame.flags.c_contiguous else frame.tobytes())
+
+	def release(self):
+		"""Flush and finish the file; returns True if ffmpeg exited cleanly."""
+		try:
+			self.proc.stdin.close()
+		except OSError:
+			pass
+		return self.proc.wait() == 0
+
+
+def _video_identity(video_path):
+	"""Path, size and mtime of the input, so a checkpoint is only reused for the same file."""
+	try:
+		st = os.stat(video_path)
+	except OSError:
+		return None
+	return {"path": str(Path(video_path).resolve()), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
 
-	# 2) Load the custom-trained YOLOv8 segmentation model
+def _part_path(output_path, n):
+	return f"{output_path}.part{n:03d}.mp4"
+
+
+def _load_checkpoint(progress_path, identity):
+	"""Return (next source frame, finished part paths) from a matching checkpoint, else (0, [])."""
+	try:
+		with open(progress_path, "r", encoding="utf-8") as f:
+			state = json.load(f)
+	except (OSError, ValueError):
+		return 0, []
+	parts = state.get("parts") or []
+	if state.get("video") != identity or not all(Path(p).is_file() for p in parts):
+		return 0, []
+	return int(state.get("next_frame", 0)), parts
+
+
+def _save_checkpoint(progress_path, identity, next_frame, parts):
+	# Write-then-rename so a crash mid-write never leaves a truncated checkpoint
+	tmp = f"{progress_path}.tmp"
+	with open(tmp, "w", encoding="utf-8") as f:
+		json.dump({"video": identity, "next_frame": next_frame, "parts": parts}, f)
+	os.replace(tmp, progress_path)
+
+
+def _concat_parts(ffmpeg, parts, output_path):
+	"""Join the encoded parts into output_path by stream copy (no re-encode); True on success."""
+	if len(parts) == 1:
+		os.replace(parts[0], output_path)
+		return True
+	list_path = f"{output_path}.parts.txt"
+	with open(list_path, "w", encoding="utf-8") as f:
+		for part in parts:
+			escaped = str(Path(part).resolve()).replace("'", "'\\''")
+			f.write(f"file '{escaped}'\n")
+	try:
+		cmd = [
+			ffmpeg,
+			"-y",
+			"-loglevel", "error",
+			"-f", "concat",
+			"-safe", "0",
+			"-i", list_path,
+			"-c", "copy",
+			"-movflags", "+faststart",
+			output_path,
+		]
+		return subprocess.run(cmd, stdout=subprocess.DEVNULL).returncode == 0
+	finally:
+		Path(list_path).unlink(missing_ok=True)
+
+
+def load_model(model_path=None, log_file=None):
+	"""
+	Load the custom-trained YOLOv8 segmentation model (defaults to backend/best.pt).
+	On a CUDA machine, an up-to-date TensorRT engine exported next to the .pt
+	(see export_engine) is loaded instead.
+	"""
+	script_dir = Path(__file__).resolve().parent
+	model_path = Path(model_path) if model_path else (script_dir / "best.pt")
+	engine_path = model_path.with_suffix(".engine")
+	if (
+		CUDA_AVAILABLE
+		and model_path.suffix == ".pt"
+		and engine_path.exists()
+		# An engine older than the weights was exported from a previous checkpoint
+		and engine_path.stat().st_mtime >= model_path.stat().st_mtime
+	):
+		model_path = engine_path
+	print(f"[YOLO] Loading model from: {model_path}", file=log_file, flush=True)
+	return YOLO(str(model_path), task="segment")
+
+
+def export_engine(model_path=None, log_file=None):
+	"""Export the .pt model to an FP16 TensorRT engine next to it (needs CUDA + TensorRT)."""
 	script_dir = Path(__file__).resolve().parent
-	model_path = Path(args.model) if args.model else (script_dir / "best.pt")
-	print(f"[YOLO] Loading model from: {model_path}", flush=True)
-	model = YOLO(str(model_path))
+	model_path = Path(model_path) if model_path else (script_dir / "best.pt")
+	print(f"[YOLO] Exporting TensorRT engine from: {model_path}", file=log_file, flush=True)
+	engine = YOLO(str(model_path)).export(
+		format="engine", half=True, dynamic=True, batch=ENGINE_MAX_BATCH, imgsz=IMGSZ, device=0
+	)
+	print(f"[YOLO] Engine written to: {engine}", file=log_file, flush=True)
+	return engine
+
 
-	# 3) Open the input video for reading
-	cap = cv2.VideoCapture(video_path)
+def run(video_path, output_path, model, display=False, prefer_h264=False, log_file=None, batch_size=DEFAULT_BATCH_SIZE, adaptive_fps=False, skip_static=False, motion_threshold=MOTION_THRESHOLD, resume=False):
+	"""
+	Run tracking + segmentation over video_path and write the annotated video to output_path.
+	`model` is an already-loaded YOLO instance so callers can reuse it across runs.
+	Progress lines go to `log_file` (default stdout), which /jobs/<id>/status parses.
+	Frames are tracked `batch_size` at a time. With adaptive_fps (live sources),
+	frames the model can't keep up with are skipped without being decoded. With
+	skip_static, near-identical frames repeat the previous annotated frame instead
+	of being tracked. With resume, the output is encoded in checkpointed parts and
+	a rerun after a crash continues from the last finished part (ffmpeg only;
+	tracker IDs restart at the resume point).
+	Returns True if the output was written.
+	"""
+	# 1) Define the path to the input video file
+	print(f"[YOLO] Starting processing for: {video_path}", file=log_file, flush=True)
+
+	# 2) Open the input video for reading
+	cap = cv2.VideoCapture(str(video_path))
 	if not cap.isOpened():
-		print(f"Error: Could not open video file: {video_path}")
-		return
+		print(f"Error: Could not open video file: {video_path}", file=log_file)
+		return False
 
-	# 4) Retrieve video properties for writer setup
+	# 3) Retrieve video properties for writer setup
 	frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
 	frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
 	fps = cap.get(cv2.CAP_PROP_FPS)
@@ -41,20 +330,36 @@ def main():
 	if fps is None or fps <= 0:
 		# Fallback FPS if metadata is missing
 		fps = 30.0
-	print(f"[YOLO] Video properties: {frame_width}x{frame_height} @ {fps}fps, frames={total_frames}", flush=True)
+	print(f"[YOLO] Video properties: {frame_width}x{frame_height} @ {fps}fps, frames={total_frames}", file=log_file, flush=True)
 
-	# 5) Create a VideoWriter to save the processed output
-	output_path = args.output
+	# 4) Create the output writer: ffmpeg (H.264) when installed, else OpenCV
+	output_path = str(output_path)
 	writer = None
-	selected_codec = None
+	ffmpeg = shutil.which("ffmpeg")
+	# Checkpointing encodes the output in parts, which needs the ffmpeg writer
+	progress_path = f"{output_path}.progress.json"
+	identity = _video_identity(video_path) if resume else None
+	checkpointing = identity is not None and ffmpeg is not None
+	if resume and not checkpointing:
+		print("[YOLO] Resume needs ffmpeg and a local input file; running without checkpoints", file=log_file, flush=True)
+	start_frame, parts = _load_checkpoint(progress_path, identity) if checkpointing else (0, [])
+	if ffmpeg:
+		try:
+			writer_path = _part_path(output_path, len(parts)) if checkpointing else output_path
+			writer = _FfmpegWriter(ffmpeg, writer_path, frame_width, frame_height, fps, log_file=log_file)
+			print("[YOLO] Using encoder: ffmpeg libx264 (H.264)", file=log_file, flush=True)
+		except OSError as e:
+			print(f"[YOLO] Could not start ffmpeg ({e}); falling back to OpenCV", file=log_file, flush=True)
+			writer = None
+			checkpointing = False
+			start_frame, parts = 0, []
 	# Try H.264 first if requested
-	if args.prefer_h264:
+	if writer is None and prefer_h264:
 		try:
 			fourcc_h264 = cv2.VideoWriter_fourcc(*"avc1")
 			writer = cv2.VideoWriter(output_path, fourcc_h264, fps, (frame_width, frame_height))
 			if writer.isOpened():
-				selected_codec = "avc1"
-				print("[YOLO] Using codec: avc1 (H.264)", flush=True)
+				print("[YOLO] Using codec: avc1 (H.264)", file=log_file, flush=True)
 			else:
 				writer.release()
 				writer = None
@@ -65,82 +370,153 @@ def main():
 		fourcc_mp4v = cv2.VideoWriter_fourcc(*"mp4v")
 		writer = cv2.VideoWriter(output_path, fourcc_mp4v, fps, (frame_width, frame_height))
 		if writer.isOpened():
-			selected_codec = "mp4v"
-			print("[YOLO] Using codec: mp4v (fallback)", flush=True)
+			print("[YOLO] Using codec: mp4v (fallback)", file=log_file, flush=True)
 		else:
-			print(f"Error: Could not open video writer for: {output_path}")
+			print(f"Error: Could not open video writer for: {output_path}", file=log_file)
 			cap.release()
-			return
+			return False
+
+	if start_frame > 0:
+		print(f"[YOLO] Resuming from frame {start_frame} ({len(parts)} part(s) already encoded)", file=log_file, flush=True)
+		cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
 
-	# 6) Process each frame: run tracking + segmentation, save and display
+	# 5) Process each frame: run tracking + segmentation, save and display
 	window_title = "YOLOv8 Segmentation"
-	if not args.no_display:
+	if display:
 		cv2.namedWindow(window_title, cv2.WINDOW_NORMAL)
 
+	# Capture and inference run on their own threads, connected by bounded queues,
+	# so decoding, the model and annotate+encode overlap instead of taking turns.
+	# Encoding (and the GUI window) stays on this thread.
+	stop = threading.Event()
+	errors = []
+	q_in = queue.Queue(maxsize=QUEUE_DEPTH)  # (source index, decoded frame)
+	q_out = queue.Queue(maxsize=batch_size)  # (source index, frame, result) in frame order
+	# Written frames go back here for the capture stage to decode into; sized for
+	# every frame that can be in flight (both queues, a batch being tracked, one each
+	# being captured and encoded)
+	frame_pool = queue.Queue(maxsize=QUEUE_DEPTH + 2 * batch_size + 2)
+	stages = [
+		threading.Thread(target=_run_stage, args=(_capture_frames, errors, stop, cap, q_in, stop, adaptive_fps, frame_pool, start_frame), name="yolo-capture", daemon=True),
+		threading.Thread(target=_run_stage, args=(_track_frames, errors, stop, model, q_in, q_out, stop, batch_size, skip_static, motion_threshold), name="yolo-track", daemon=True),
+	]
+	for t in stages:
+		t.start()
+
 	frame_index = 0
-	while True:
-		ret, frame = cap.read()
-		if not ret:
-			# End of video or read error
-			break
-
-		# Run tracking with persistence for continuous IDs across frames
-		results = model.track(frame, persist=True, verbose=False)
-
-		# Get the annotated frame (masks/boxes/labels drawn)
-		annotated_frame = results[0].plot() if results else frame
-
-		# Write to output video
-		writer.write(annotated_frame)
-		frame_index += 1
-		# Print occasional progress updates
-		if frame_index % 30 == 0:
-			if total_frames > 0:
-				percent = (frame_index / total_frames) * 100.0
-				print(f"[YOLO] Progress: {frame_index}/{total_frames} frames ({percent:.1f}%)", flush=True)
-			else:
-				print(f"[YOLO] Progress: {frame_index} frames processed", flush=True)
+	part_frames = 0
+	annotated_frame = None
+	encode_failed = False
+	try:
+		while True:
+			item = _get(q_out, stop)
+			if item is None:
+				break
+			source_index, frame, result = item
 
-		# Display the annotated frame
-		if not args.no_display:
-			cv2.imshow(window_title, annotated_frame)
+			# Get the annotated frame (masks/boxes/labels drawn); static frames
+			# (result None) repeat the last one
+			if result is not None:
+				annotated_frame = result.plot()
 
-		# Break on 'q' key press
-		if not args.no_display:
-			if cv2.waitKey(1) & 0xFF == ord("q"):
+			# Write to output video. A broken pipe means ffmpeg exited early; its
+			# stderr (in the job log) says why
+			try:
+				writer.write(annotated_frame)
+			except BrokenPipeError:
+				encode_failed = True
 				break
-
-	# 7) Release resources and close windows
-	cap.release()
-	writer.release()
-	if not args.no_display:
-		cv2.destroyAllWindows()
-	print(f"[YOLO] Done. Output saved to: {output_path}", flush=True)
-
-	# Optional: transcode to H.264 using ffmpeg if available and we didn't already use H.264
-	if selected_codec != "avc1":
-		ffmpeg = shutil.which("ffmpeg")
-		if ffmpeg:
-			print("[YOLO] Transcoding to H.264 for browser playback...", flush=True)
-			tmp_out = str(Path(output_path).with_suffix(".h264.mp4"))
+			# plot() drew on a copy, so the decoded frame can be reused
 			try:
-				# Faststart helps streaming; -y to overwrite
-				cmd = [
-					ffmpeg,
-					"-y",
-					"-i", output_path,
-					"-c:v", "libx264",
-					"-preset", "veryfast",
-					"-movflags", "+faststart",
-					tmp_out,
-				]
-				subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-				# Replace original
-				Path(output_path).unlink(missing_ok=True)
-				Path(tmp_out).rename(output_path)
-				print("[YOLO] Transcode complete.", flush=True)
-			except Exception as e:
-				print(f"[YOLO] Transcode skipped/failed: {e}", flush=True)
+				frame_pool.put_nowait(frame)
+			except queue.Full:
+				pass
+			frame_index += 1
+			part_frames += 1
+			# Close the part and checkpoint past it
+			if checkpointing and part_frames == CHECKPOINT_EVERY:
+				part = _part_path(output_path, len(parts))
+				if not writer.release():
+					encode_failed = True
+					break
+				parts.append(part)
+				_save_checkpoint(progress_path, identity, source_index + 1, parts)
+				writer = _FfmpegWriter(ffmpeg, _part_path(output_path, len(parts)), frame_width, frame_height, fps, log_file=log_file)
+				part_frames = 0
+			# Print occasional progress updates (by source position, so dropped frames count)
+			if frame_index % 30 == 0:
+				if total_frames > 0:
+					percent = min(100.0, (source_index + 1) / total_frames * 100.0)
+					print(f"[YOLO] Progress: {source_index + 1}/{total_frames} frames ({percent:.1f}%)", file=log_file, flush=True)
+				else:
+					print(f"[YOLO] Progress: {frame_index} frames processed", file=log_file, flush=True)
+
+			# Display the annotated frame; break on 'q' key press. Only with --display,
+			# since waitKey pumps the GUI event loop on every frame
+			if display:
+				cv2.imshow(window_title, annotated_frame)
+				if cv2.waitKey(1) & 0xFF == ord("q"):
+					break
+	finally:
+		stop.set()
+		for t in stages:
+			t.join()
+		# 6) Release resources and close windows, also when the loop raised, so
+		# ffmpeg is always waited for and the capture closed
+		cap.release()
+		released = writer.release() is not False
+		if display:
+			cv2.destroyAllWindows()
+
+	# An empty trailing part (run ended right after a checkpoint) is dropped below
+	encoded = not encode_failed and (released or (checkpointing and part_frames == 0))
+	if errors:
+		raise errors[0]
+	if not encoded:
+		print(f"Error: ffmpeg failed to encode: {output_path}", file=log_file)
+		return False
+	if checkpointing:
+		last_part = _part_path(output_path, len(parts))
+		if part_frames > 0:
+			parts.append(last_part)
+		else:
+			Path(last_part).unlink(missing_ok=True)
+		if not parts or not _concat_parts(ffmpeg, parts, output_path):
+			print(f"Error: could not join encoded parts into: {output_path}", file=log_file)
+			return False
+		for part in parts:
+			Path(part).unlink(missing_ok=True)
+		Path(progress_path).unlink(missing_ok=True)
+	print(f"[YOLO] Done. Output saved to: {output_path}", file=log_file, flush=True)
+
+	return True
+
+
+def main():
+	# Parse CLI args
+	parser = argparse.ArgumentParser(description="Run YOLOv8 segmentation on a video.")
+	parser.add_argument("--video", type=str, default="/Users/rudra/Documents/Hackathons/OceanHub/manythings.mp4", help="Path to input mp4")
+	parser.add_argument("--output", type=str, default="output_video.mp4", help="Path to save annotated mp4")
+	parser.add_argument("--model", type=str, default=None, help="Path to YOLO model .pt (defaults to backend/best.pt)")
+	parser.add_argument("--display", dest="display", action="store_true", default=False, help="Show the annotated frames in a GUI window (off by default)")
+	# Accepted for older callers; display is already off unless --display is given
+	parser.add_argument("--no-display", dest="display", action="store_false", help=argparse.SUPPRESS)
+	parser.add_argument("--prefer-h264", action="store_true", help="Prefer OpenCV's H.264 encoder when ffmpeg is not installed")
+	parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help=f"Frames per tracking call (at most {ENGINE_MAX_BATCH} with a TensorRT engine)")
+	parser.add_argument("--adaptive-fps", action="store_true", help="Skip (without decoding) frames that arrive while inference is behind; for live sources")
+	parser.add_argument("--skip-static", action="store_true", help="Don't track frames that barely differ from the last tracked one; reuse its annotation")
+	parser.add_argument("--motion-threshold", type=float, default=MOTION_THRESHOLD, help=f"Mean grayscale difference (0-255) below which --skip-static treats a frame as static. Default: {MOTION_THRESHOLD}")
+	parser.add_argument("--resume", action="store_true", help=f"Checkpoint every {CHECKPOINT_EVERY} frames and continue an interrupted run for the same --output (needs ffmpeg)")
+	parser.add_argument("--export-engine", action="store_true", help="Export the model to an FP16 TensorRT engine next to it and exit")
+	args = parser.parse_args()
+
+	if args.export_engine:
+		export_engine(args.model)
+		return
+
+	model = load_model(args.model)
+	if not run(args.video, args.output, model, display=args.display, prefer_h264=args.prefer_h264, batch_size=max(1, args.batch_size), adaptive_fps=args.adaptive_fps, skip_static=args.skip_static, motion_threshold=args.motion_threshold, resume=args.resume):
+		sys.exit(1)
 
 
 if __name__ == "__main__":
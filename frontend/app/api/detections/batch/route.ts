@@ -0,0 +1,39 @@
+import { NextRequest, NextResponse } from "next/server"
+import { trashDetectionsStore } from "@/lib/trash-detections-store"
+import { parseDetection } from "@/lib/detection-payload"
+import type { TrashDetection } from "@/components/new-trash-detection-log"
+
+/**
+ * POST /api/detections/batch
+ * Add several detections in one request (used by the analyzer's background sender)
+ * 
+ * Request body: { "detections": [ <same shape as POST /api/detections>, ... ] }
+ * 
+ * Valid entries are added even when others are rejected; rejected ones are
+ * reported by their index in `errors`.
+ */
+export async function POST(request: NextRequest) {
+  try {
+    const body = await request.json()
+    if (!Array.isArray(body?.detections)) {
+      return NextResponse.json({ error: "Expected a detections array" }, { status: 400 })
+    }
+    
+    const detections: TrashDetection[] = []
+    const errors: { index: number; error: string }[] = []
+    body.detections.forEach((item: unknown, index: number) => {
+      const parsed = parseDetection(item)
+      if ("error" in parsed) {
+        errors.push({ index, error: parsed.error })
+      } else {
+        detections.push(trashDetectionsStore.add(parsed.detection))
+      }
+    })
+    
+    const status = detections.length > 0 || errors.length === 0 ? 201 : 400
+    return NextResponse.json({ success: errors.length === 0, detections, errors }, { status })
+  } catch (error) {
+    console.error("Error adding detections:", error)
+    return NextResponse.json({ error: "Invalid request body" }, { status: 400 })
+  }
+}
@@ -1,5 +1,6 @@
 import { NextRequest, NextResponse } from "next/server"
 import { trashDetectionsStore } from "@/lib/trash-detections-store"
+import { parseDetection } from "@/lib/detection-payload"
 
 /**
  * GET /api/detections
@@ -31,52 +32,13 @@ export async function GET() {
 export async function POST(request: NextRequest) {
   try {
     const body = await request.json()
-    const normalizePublicImagePath = (image: string): string => {
-      if (!image || typeof image !== "string") return "/placeholder.svg"
-      let src = image.trim()
-      // Fix accidental trailing digits after extension (e.g., ".png1" -> ".png")
-      src = src.replace(/\.(png|jpe?g|webp)\d+$/i, (m) => m.replace(/\d+$/, ""))
-      if (!src.startsWith("http") && !src.startsWith("/")) {
-        src = "/" + src
-      }
-      const fileOnly = src.replace(/^\//, "")
-      if (!src.startsWith("http") && !src.startsWith("/detections/") && /^test_detection_\d+\.(png|jpe?g|webp)$/i.test(fileOnly)) {
-        src = "/detections/" + fileOnly
-      }
-      return src
-    }
-    
-    // Validate required fields
-    const required = [
-      "trashType",
-      "threatLevel",
-      "decompositionYears",
-      "environmentalImpact",
-      "disposalInstructions",
-      "probableSource",
-      "image",
-    ]
-    
-    for (const field of required) {
-      if (!body[field]) {
-        return NextResponse.json({ error: `Missing required field: ${field}` }, { status: 400 })
-      }
+    const parsed = parseDetection(body)
+    if ("error" in parsed) {
+      return NextResponse.json({ error: parsed.error }, { status: 400 })
     }
     
     // Add detection to store
-    const detection = trashDetectionsStore.add({
-      trashType: body.trashType,
-      threatLevel: body.threatLevel,
-      decompositionYears: body.decompositionYears,
-      environmentalImpact: body.environmentalImpact,
-      disposalInstructions: body.disposalInstructions,
-      probableSource: body.probableSource,
-      image: normalizePublicImagePath(body.image),
-      confidence: body.confidence || 95,
-      location: body.location || "Unknown",
-      size: body.size || "Medium",
-      timestamp: body.timestamp,
-    })
+    const detection = trashDetectionsStore.add(parsed.detection)
     
     return NextResponse.json({ success: true, detection }, { status: 201 })
   } catch (error) {
@@ -69,7 +69,10 @@ export function AiAnalystPanel() {
         // Start polling status with progress
         const interval = setInterval(async () => {
           try {
-            const r = await fetch(`http://localhost:5001/jobs/${data.job_id}/status`)
+            // Only ask for what the panel renders; skips the 50-line log tail
+            const r = await fetch(
+              `http://localhost:5001/jobs/${data.job_id}/status?fields=status,progress_percent,output_url`
+            )
             const s = await r.json()
             if (s?.status === "finished") {
               clearInterval(interval)
@@ -0,0 +1,62 @@
+/**
+ * Validation shared by POST /api/detections and POST /api/detections/batch
+ */
+
+import type { TrashDetection } from "@/components/new-trash-detection-log"
+
+export type DetectionInput = Omit<TrashDetection, "id"> & { id?: number }
+
+const REQUIRED_FIELDS = [
+  "trashType",
+  "threatLevel",
+  "decompositionYears",
+  "environmentalImpact",
+  "disposalInstructions",
+  "probableSource",
+  "image",
+]
+
+export function normalizePublicImagePath(image: string): string {
+  if (!image || typeof image !== "string") return "/placeholder.svg"
+  let src = image.trim()
+  // Fix accidental trailing digits after extension (e.g., ".png1" -> ".png")
+  src = src.replace(/\.(png|jpe?g|webp)\d+$/i, (m) => m.replace(/\d+$/, ""))
+  if (!src.startsWith("http") && !src.startsWith("/")) {
+    src = "/" + src
+  }
+  const fileOnly = src.replace(/^\//, "")
+  if (!src.startsWith("http") && !src.startsWith("/detections/") && /^test_detection_\d+\.(png|jpe?g|webp)$/i.test(fileOnly)) {
+    src = "/detections/" + fileOnly
+  }
+  return src
+}
+
+/**
+ * Turn one request body into a store entry, or an error message naming the
+ * first missing required field
+ */
+export function parseDetection(body: any): { detection: DetectionInput } | { error: string } {
+  if (!body || typeof body !== "object") {
+    return { error: "Detection must be an object" }
+  }
+  for (const field of REQUIRED_FIELDS) {
+    if (!body[field]) {
+      return { error: `Missing required field: ${field}` }
+    }
+  }
+  return {
+    detection: {
+      trashType: body.trashType,
+      threatLevel: body.threatLevel,
+      decompositionYears: body.decompositionYears,
+      environmentalImpact: body.environmentalImpact,
+      disposalInstructions: body.disposalInstructions,
+      probableSource: body.probableSource,
+      image: normalizePublicImagePath(body.image),
+      confidence: body.confidence || 95,
+      location: body.location || "Unknown",
+      size: body.size || "Medium",
+      timestamp: body.timestamp,
+    },
+  }
+}